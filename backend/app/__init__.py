@@ -1,34 +1,60 @@
+import time
 from flask import Flask
-from firebase_admin import firestore, credentials, initialize_app
 from flask_cors import CORS
-import cloudinary
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
-
-db = None
-'''Initialzing Firebase app'''
-cred = credentials.Certificate('supersecret.json')
-initialize_app(cred)
-db = firestore.client()
-
-def create_app():
+from app.firebase import LazyFirestoreClient, get_firebase_app
+from app.datastore import create_datastore
+from app.datastore.instrumented import init_request_accounting
+from app.routes.utils.metrics import init_metrics
+from app.logging_config import init_logging
+from app.routes.utils.compression import init_compression
+from app.json_provider import FirestoreJSONProvider
+
+
+def create_app(config_overrides=None):
+    """
+    Build the Flask app. Nothing here opens a network connection: the
+    Firestore client and Cloudinary SDK are created on first use in each
+    worker process. Tests and benchmarks can pass `{'db': backend}` in
+    `config_overrides` to inject a data backend instead of Firestore.
+    """
+    started = time.perf_counter()
     app = Flask(__name__)
+    app.config.update(config_overrides or {})
+    app.json = FirestoreJSONProvider(app)
+
+    '''Taking the client address from the reverse proxy, so per-IP rate limits see real clients'''
+    if Config.TRUSTED_PROXY_HOPS > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_HOPS)
 
-    '''Initializing Imagekit App'''
-    # SDK initialization
-    cloudinary.config(
-        cloud_name = Config.CLOUDINARY_CLOUD_NAME,
-        api_key = Config.CLOUDINARY_API_KEY,
-        api_secret = Config.CLOUDINARY_API_SECRET,
-        secure = True  # Always use HTTPS URLs
-    )
-    
+    '''Sending all logging through the JSON queue listener'''
+    init_logging(app)
 
     '''Enabling Flask CORS to the app'''
     CORS(app, supports_credentials=True, origins=["http://localhost:5173"])
 
     '''Attaching DB Config'''
-    app.config['db'] = db
+    if 'db' not in app.config and Config.DATA_BACKEND != 'firestore':
+        app.config['db'] = create_datastore(Config.DATA_BACKEND)
+
+    if 'db' not in app.config:
+        app.config['db'] = LazyFirestoreClient()
+
+        '''Initialzing Firebase app for this worker on its first request'''
+        @app.before_request
+        def ensure_firebase_app():
+            get_firebase_app()
+
+    '''Compressing large responses; registered before the metrics and datastore hooks so it runs after them'''
+    init_compression(app)
 
+    '''Recording route and upstream metrics, served on /metrics'''
+    init_metrics(app)
+
+    '''Counting datastore reads and writes per request'''
+    if Config.DATASTORE_ACCOUNTING:
+        init_request_accounting(app)
 
     '''Registering Auth Blueprint'''
     from app.routes.auth.bp import auth_bp
@@ -70,5 +96,26 @@ def create_app():
 
     from app.routes.services.manage_posts import posts_bp
     app.register_blueprint(posts_bp, url_prefix='/api/posts')
-    
+
+    from app.routes.services.manage_poll import polls_bp
+    app.register_blueprint(polls_bp, url_prefix='/api/polls')
+
+    '''Starting Background Schedulers in each worker, after any fork'''
+    from app.routes.utils.event_scheduler import start_event_status_scheduler
+    from app.routes.utils.like_rollup import start_like_rollup_scheduler
+    from app.routes.utils.image_upload_queue import start_image_upload_sweeper
+
+    @app.before_request
+    def ensure_schedulers():
+        start_event_status_scheduler(app)
+        start_like_rollup_scheduler(app)
+        start_image_upload_sweeper(app)
+
+    cold_start_ms = (time.perf_counter() - started) * 1000
+    app.config['COLD_START_MS'] = cold_start_ms
+    if cold_start_ms > Config.COLD_START_BUDGET_MS:
+        app.logger.warning(f"create_app took {cold_start_ms:.0f}ms, over the {Config.COLD_START_BUDGET_MS}ms budget")
+    else:
+        app.logger.info(f"create_app took {cold_start_ms:.0f}ms")
+
     return app
\ No newline at end of file
@@ -7,4 +7,66 @@ class Config:
     FIREBASE_API_KEY = os.getenv('FIREBASE_API_KEY', 'your_firebase_api_key')
     CLOUDINARY_CLOUD_NAME = os.getenv('CLOUDINARY_CLOUD_NAME', 'your_cloud_name')
     CLOUDINARY_API_KEY = os.getenv('CLOUDINARY_API_KEY', 'your_api_key')
-    CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET', 'your_api_secret')
\ No newline at end of file
+    CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET', 'your_api_secret')
+    # Seconds a worker may serve cached public listings after an edit made on another worker
+    NEWS_CACHE_TTL = int(os.getenv('NEWS_CACHE_TTL', 300))
+
+    IMAGE_UPLOAD_WORKERS = int(os.getenv('IMAGE_UPLOAD_WORKERS', 2))
+    IMAGE_UPLOAD_MAX_ATTEMPTS = int(os.getenv('IMAGE_UPLOAD_MAX_ATTEMPTS', 3))
+    # Seconds after which a still pending image upload counts as lost to a restart and is marked failed, 0 disables the sweep
+    IMAGE_UPLOAD_STALE_AFTER = int(os.getenv('IMAGE_UPLOAD_STALE_AFTER', 900))
+    COMMUNITY_CACHE_TTL = int(os.getenv('COMMUNITY_CACHE_TTL', 300))
+    # Free-form event dates and times are read in this timezone
+    EVENT_TIMEZONE = os.getenv('EVENT_TIMEZONE', 'Asia/Kathmandu')
+    # Seconds between runs of the event status scheduler, 0 disables it
+    EVENT_STATUS_INTERVAL = int(os.getenv('EVENT_STATUS_INTERVAL', 300))
+    # Seconds between rollups of post like shards into like_count, how stale listed like counts can get
+    LIKE_ROLLUP_INTERVAL = max(1, int(os.getenv('LIKE_ROLLUP_INTERVAL', 5)))
+    # Small read-mostly collections are mirrored in memory per worker
+    MIRROR_ENABLED = os.getenv('MIRROR_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    MIRROR_MAX_BYTES = int(os.getenv('MIRROR_MAX_BYTES', 16 * 1024 * 1024))
+    # Seconds a worker serves aggregated poll counts before re-reading the shards
+    POLL_RESULTS_TTL = int(os.getenv('POLL_RESULTS_TTL', 2))
+    FIREBASE_CREDENTIALS = os.getenv('FIREBASE_CREDENTIALS', 'supersecret.json')
+    # create_app() logs a warning when it takes longer than this
+    COLD_START_BUDGET_MS = int(os.getenv('COLD_START_BUDGET_MS', 1000))
+    # firestore or memory; memory keeps all data in the process and is lost on restart
+    DATA_BACKEND = os.getenv('DATA_BACKEND', 'firestore')
+    # Per-request datastore accounting; a request over these budgets logs a warning. Endpoints that list a
+    # whole collection have no read budget, see FULL_SCAN_BUDGETS in app/datastore/instrumented.py
+    DATASTORE_ACCOUNTING = os.getenv('DATASTORE_ACCOUNTING', 'true').lower() in ('true', '1', 'yes')
+    DATASTORE_DEBUG_HEADERS = os.getenv('DATASTORE_DEBUG_HEADERS', 'false').lower() in ('true', '1', 'yes')
+    DATASTORE_READ_BUDGET = int(os.getenv('DATASTORE_READ_BUDGET', 500))
+    DATASTORE_WRITE_BUDGET = int(os.getenv('DATASTORE_WRITE_BUDGET', 100))
+    DATASTORE_ROUND_TRIP_BUDGET = int(os.getenv('DATASTORE_ROUND_TRIP_BUDGET', 25))
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    # Share of sub-WARNING records kept per request; LOG_SAMPLE_RATES overrides it per endpoint, e.g. "leaderboard.get_leaderboard_info=0.1"
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+    # Outbound REST calls: seconds to connect and to wait for a response, retries and pooled connections per host
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+    # Auth endpoint rate limits; RATE_LIMIT_STORE is memory (per worker) or redis (shared)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 10000))
+    # Reverse proxies in front of the app whose X-Forwarded-For entry is trusted as the client address.
+    # Leave at 0 unless every request arrives through that many proxies, or clients can spoof their IP
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', 0))
+    # PBKDF2 rounds for passwords in bulk member imports; Firebase re-hashes them on first sign-in
+    BULK_IMPORT_HASH_ROUNDS = int(os.getenv('BULK_IMPORT_HASH_ROUNDS', 25000))
+    # Documents read per Firestore query while streaming an export
+    EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', 500))
+    # Seconds before a worker rebuilds its member directory index, picking up edits made elsewhere
+    MEMBER_INDEX_TTL = int(os.getenv('MEMBER_INDEX_TTL', 300))
+    # Response compression: smallest body worth compressing, gzip level (1-9) and brotli quality (0-11, needs the brotli package)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    # Async views: threads for blocking SDK calls, and whether Firestore is reached through its AsyncClient
+    ASYNC_IO_WORKERS = int(os.getenv('ASYNC_IO_WORKERS', 32))
+    FIRESTORE_ASYNC_CLIENT = os.getenv('FIRESTORE_ASYNC_CLIENT', 'true').lower() in ('true', '1', 'yes')
\ No newline at end of file
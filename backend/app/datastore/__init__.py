@@ -0,0 +1,24 @@
+from app.datastore.memory import MemoryFirestore
+
+'''
+Data backends for `app.config['db']`.
+
+Handlers only use the Firestore client API (collection, document, query,
+batch, transaction), so any object implementing it can be swapped in.
+'firestore' is the production client; 'memory' keeps everything in the
+process, for local runs, load tests and benchmarks.
+'''
+
+BACKENDS = ('firestore', 'memory')
+
+
+def create_datastore(kind):
+    if kind == 'memory':
+        return MemoryFirestore()
+    if kind == 'firestore':
+        from app.firebase import LazyFirestoreClient
+        return LazyFirestoreClient()
+    raise ValueError(f'Unknown DATA_BACKEND {kind!r}, expected one of {BACKENDS}')
+
+
+__all__ = ['BACKENDS', 'MemoryFirestore', 'create_datastore']
@@ -0,0 +1,262 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.config import Config
+from app.datastore.instrumented import InstrumentedClient, current_stats
+from app.firebase import LazyFirestoreClient, get_firebase_app
+
+'''
+Async data-store access for `async def` views.
+
+Flask runs each async view in an event loop of its own, so the views
+can wait on several Firestore, Auth and Cloudinary calls at once with
+asyncio.gather instead of one after another.
+
+`get_async_db()` returns an AsyncDatastore with the familiar builder
+API (collection, document, where, order_by, limit, batch) whose
+terminal calls (get, count, set, update, delete, add, commit and
+get_all) are coroutines. With Firestore it drives one
+google.cloud.firestore AsyncClient per process. The client's gRPC channel is tied to the event
+loop it was created in, so it lives on a long-running I/O loop thread
+and every call is handed to that loop; the channel stays warm across
+requests instead of being rebuilt per view. Any other backend (the
+in-memory one, or FIRESTORE_ASYNC_CLIENT off) is driven through its
+sync client on a shared thread pool, which keeps request accounting
+working unchanged.
+
+`run_blocking` runs SDK calls that have no async API, such as
+Firebase Auth and Cloudinary, on the same thread pool.
+'''
+
+_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_io_loop = None
+_io_loop_pid = None
+_async_client = None
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=Config.ASYNC_IO_WORKERS, thread_name_prefix='async-io')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """
+    Await a blocking call on the shared thread pool. The call sees the
+    caller's context, so `request`, `g` and `current_app` keep working.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+def _get_io_loop():
+    """This process's I/O loop, started on first use and again after a fork."""
+    global _io_loop, _io_loop_pid, _async_client
+    with _lock:
+        if _io_loop is None or _io_loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='firestore-io-loop', daemon=True).start()
+            _io_loop, _io_loop_pid, _async_client = loop, os.getpid(), None
+        return _io_loop
+
+
+def _get_async_client(loop):
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    async def create():
+        from firebase_admin import firestore_async
+        return firestore_async.client(get_firebase_app())
+
+    with _lock:
+        if _async_client is None:
+            # Created on the I/O loop, so its channel belongs to that loop
+            _async_client = asyncio.run_coroutine_threadsafe(create(), loop).result()
+        return _async_client
+
+
+def _count(**counts):
+    stats = current_stats()
+    if stats is not None:
+        for key, value in counts.items():
+            setattr(stats, key, getattr(stats, key) + value)
+
+
+def _native(value):
+    return value._native if isinstance(value, (AsyncDocument, AsyncQuery)) else value
+
+
+class AsyncDatastore:
+    def __init__(self, client, loop=None):
+        # With a loop, `client` is an AsyncClient living on it; without one, a sync client
+        self._client = client
+        self._loop = loop
+
+    @property
+    def is_native_async(self):
+        return self._loop is not None
+
+    async def _call(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) is a coroutine on the AsyncClient, or a blocking call otherwise."""
+        if self._loop is None:
+            return await run_blocking(fn, *args, **kwargs)
+        future = asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def collection(self, name):
+        return AsyncCollection(self, self._client.collection(name))
+
+    def batch(self):
+        return AsyncBatch(self, self._client.batch())
+
+    async def get_all(self, references, field_paths=None):
+        references = [_native(reference) for reference in references]
+        if not self.is_native_async:
+            return await run_blocking(lambda: list(self._client.get_all(references, field_paths=field_paths)))
+
+        async def fetch():
+            return [snapshot async for snapshot in self._client.get_all(references, field_paths=field_paths)]
+        snapshots = await self._call(fetch)
+        _count(reads=len(snapshots), round_trips=1)
+        return snapshots
+
+
+class AsyncQuery:
+    def __init__(self, store, native):
+        self._store = store
+        self._native = native
+
+    def _chain(self, method, *args, **kwargs):
+        return AsyncQuery(self._store, getattr(self._native, method)(*args, **kwargs))
+
+    def where(self, *args, **kwargs):
+        return self._chain('where', *args, **kwargs)
+
+    def order_by(self, *args, **kwargs):
+        return self._chain('order_by', *args, **kwargs)
+
+    def limit(self, count):
+        return self._chain('limit', count)
+
+    def select(self, field_paths):
+        return self._chain('select', field_paths)
+
+    def start_after(self, cursor):
+        return self._chain('start_after', cursor)
+
+    async def get(self):
+        """All matching document snapshots, as a list."""
+        if not self._store.is_native_async:
+            return await run_blocking(lambda: list(self._native.stream()))
+        docs = await self._store._call(self._native.get)
+        _count(reads=max(1, len(docs)), queries=1, round_trips=1)
+        return docs
+
+    async def count(self):
+        """Number of matching documents, without fetching them from Firestore."""
+        if not self._store.is_native_async:
+            return await run_blocking(lambda: sum(1 for _ in self._native.stream()))
+        result = await self._store._call(lambda: self._native.count().get())
+        total = result[0][0].value
+        # Aggregations are billed one read per 1000 index entries
+        _count(reads=max(1, -(-total // 1000)), queries=1, round_trips=1)
+        return total
+
+
+class AsyncCollection(AsyncQuery):
+    @property
+    def id(self):
+        return self._native.id
+
+    def document(self, *path):
+        return AsyncDocument(self._store, self._native.document(*path))
+
+    async def add(self, data):
+        result = await self._store._call(self._native.add, data)
+        if self._store.is_native_async:
+            _count(writes=1, round_trips=1)
+        return result
+
+
+class AsyncDocument:
+    def __init__(self, store, native):
+        self._store = store
+        self._native = native
+
+    @property
+    def id(self):
+        return self._native.id
+
+    @property
+    def path(self):
+        return self._native.path
+
+    def collection(self, name):
+        return AsyncCollection(self._store, self._native.collection(name))
+
+    async def get(self, field_paths=None):
+        snapshot = await self._store._call(self._native.get, field_paths=field_paths)
+        if self._store.is_native_async:
+            _count(reads=1, round_trips=1)
+        return snapshot
+
+    async def _write(self, method, *args, **kwargs):
+        result = await self._store._call(getattr(self._native, method), *args, **kwargs)
+        if self._store.is_native_async:
+            _count(writes=1, round_trips=1)
+        return result
+
+    async def set(self, data, merge=False):
+        return await self._write('set', data, merge=merge)
+
+    async def update(self, data):
+        return await self._write('update', data)
+
+    async def delete(self):
+        return await self._write('delete')
+
+
+class AsyncBatch:
+    def __init__(self, store, native):
+        self._store = store
+        self._native = native
+        self._writes = 0
+
+    def set(self, reference, data, merge=False):
+        self._native.set(_native(reference), data, merge=merge)
+        self._writes += 1
+
+    def update(self, reference, data):
+        self._native.update(_native(reference), data)
+        self._writes += 1
+
+    def delete(self, reference):
+        self._native.delete(_native(reference))
+        self._writes += 1
+
+    async def commit(self):
+        result = await self._store._call(self._native.commit)
+        if self._store.is_native_async:
+            _count(writes=self._writes, round_trips=1)
+        return result
+
+
+def get_async_db():
+    """The AsyncDatastore for `app.config['db']`."""
+    db = current_app.config['db']
+    backend = db._wrapped if isinstance(db, InstrumentedClient) else db
+    if isinstance(backend, LazyFirestoreClient) and Config.FIRESTORE_ASYNC_CLIENT:
+        loop = _get_io_loop()
+        return AsyncDatastore(_get_async_client(loop), loop)
+    return AsyncDatastore(db)
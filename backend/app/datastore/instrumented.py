@@ -0,0 +1,345 @@
+import collections
+from flask import g, has_request_context, request, current_app
+from app.config import Config
+
+'''
+Per-request accounting of data-store traffic.
+
+`InstrumentedClient` wraps whatever client sits in `app.config['db']`
+(Firestore or the in-memory backend) and hands out thin proxies for
+collections, documents, queries, batches and transactions. Each call
+that reaches the backend is tallied on `g` for the current request:
+
+    reads        documents returned (an empty query is billed as one)
+    writes       documents set, updated, created or deleted
+    queries      query executions
+    round_trips  calls that cross the network
+
+Proxies unwrap themselves before reaching the backend, so handlers can
+mix wrapped and raw references freely. Work done outside a request
+(schedulers, upload threads, listeners) is not counted.
+'''
+
+HEADER_PREFIX = 'X-Datastore-'
+
+
+class RequestStats:
+    __slots__ = ('reads', 'writes', 'queries', 'round_trips', 'documents')
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.queries = 0
+        self.round_trips = 0
+        self.documents = collections.Counter()
+
+    def repeated_reads(self):
+        return {path: count for path, count in self.documents.items() if count > 1}
+
+    def as_dict(self):
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'queries': self.queries,
+            'round_trips': self.round_trips,
+        }
+
+
+def current_stats():
+    """The RequestStats of the active request, or None outside of one."""
+    if not has_request_context():
+        return None
+    return g.get('datastore_stats')
+
+
+def _unwrap(value):
+    return value._wrapped if isinstance(value, _Proxy) else value
+
+
+class _Proxy:
+    __slots__ = ('_wrapped',)
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def __eq__(self, other):
+        return self._wrapped == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._wrapped)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self._wrapped!r}>'
+
+
+class DocumentSnapshotProxy(_Proxy):
+    __slots__ = ()
+
+    @property
+    def reference(self):
+        return DocumentProxy(self._wrapped.reference)
+
+
+class DocumentProxy(_Proxy):
+    __slots__ = ()
+
+    @property
+    def parent(self):
+        return CollectionProxy(self._wrapped.parent)
+
+    def collection(self, collection_id):
+        return CollectionProxy(self._wrapped.collection(collection_id))
+
+    def get(self, field_paths=None, transaction=None):
+        snapshot = self._wrapped.get(field_paths=field_paths, transaction=_unwrap(transaction))
+        stats = current_stats()
+        if stats is not None:
+            stats.reads += 1
+            stats.round_trips += 1
+            stats.documents[self._wrapped.path] += 1
+        return DocumentSnapshotProxy(snapshot)
+
+    def _write(self, method, *args, **kwargs):
+        result = getattr(self._wrapped, method)(*args, **kwargs)
+        stats = current_stats()
+        if stats is not None:
+            stats.writes += 1
+            stats.round_trips += 1
+        return result
+
+    def set(self, document_data, merge=False):
+        return self._write('set', document_data, merge=merge)
+
+    def create(self, document_data):
+        return self._write('create', document_data)
+
+    def update(self, field_updates):
+        return self._write('update', field_updates)
+
+    def delete(self):
+        return self._write('delete')
+
+
+class QueryProxy(_Proxy):
+    __slots__ = ()
+
+    def _chain(self, method, *args, **kwargs):
+        args = [_unwrap(arg) for arg in args]
+        return QueryProxy(getattr(self._wrapped, method)(*args, **kwargs))
+
+    def where(self, *args, **kwargs):
+        return self._chain('where', *args, **kwargs)
+
+    def order_by(self, *args, **kwargs):
+        return self._chain('order_by', *args, **kwargs)
+
+    def limit(self, *args, **kwargs):
+        return self._chain('limit', *args, **kwargs)
+
+    def offset(self, *args, **kwargs):
+        return self._chain('offset', *args, **kwargs)
+
+    def select(self, *args, **kwargs):
+        return self._chain('select', *args, **kwargs)
+
+    def start_at(self, *args, **kwargs):
+        return self._chain('start_at', *args, **kwargs)
+
+    def start_after(self, *args, **kwargs):
+        return self._chain('start_after', *args, **kwargs)
+
+    def end_at(self, *args, **kwargs):
+        return self._chain('end_at', *args, **kwargs)
+
+    def end_before(self, *args, **kwargs):
+        return self._chain('end_before', *args, **kwargs)
+
+    def stream(self, transaction=None):
+        stats = current_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.round_trips += 1
+        returned = 0
+        for snapshot in self._wrapped.stream(transaction=_unwrap(transaction)):
+            returned += 1
+            if stats is not None:
+                stats.reads += 1
+            yield DocumentSnapshotProxy(snapshot)
+        if stats is not None and not returned:
+            stats.reads += 1
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction=transaction))
+
+
+class CollectionProxy(QueryProxy):
+    __slots__ = ()
+
+    @property
+    def parent(self):
+        parent = self._wrapped.parent
+        return DocumentProxy(parent) if parent is not None else None
+
+    def document(self, document_id=None):
+        return DocumentProxy(self._wrapped.document(document_id))
+
+    def add(self, document_data, document_id=None):
+        update_time, ref = self._wrapped.add(document_data, document_id=document_id)
+        stats = current_stats()
+        if stats is not None:
+            stats.writes += 1
+            stats.round_trips += 1
+        return update_time, DocumentProxy(ref)
+
+
+class WriteBatchProxy(_Proxy):
+    """Writes are counted when staged; the commit is the round trip."""
+
+    __slots__ = ()
+
+    def _stage(self, method, reference, *args, **kwargs):
+        getattr(self._wrapped, method)(_unwrap(reference), *args, **kwargs)
+        stats = current_stats()
+        if stats is not None:
+            stats.writes += 1
+        return self
+
+    def set(self, reference, document_data, merge=False):
+        return self._stage('set', reference, document_data, merge=merge)
+
+    def create(self, reference, document_data):
+        return self._stage('create', reference, document_data)
+
+    def update(self, reference, field_updates):
+        return self._stage('update', reference, field_updates)
+
+    def delete(self, reference, *args, **kwargs):
+        return self._stage('delete', reference, *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.round_trips += 1
+        return self._wrapped.commit(*args, **kwargs)
+
+
+class TransactionProxy(WriteBatchProxy):
+    """
+    Passed to `@firestore.transactional` functions in place of the real
+    transaction; the decorator's private calls fall through __getattr__.
+    Begin and commit are round trips, so a retried transaction shows up.
+    """
+
+    __slots__ = ()
+
+    def _begin(self, *args, **kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.round_trips += 1
+        return self._wrapped._begin(*args, **kwargs)
+
+    def _commit(self, *args, **kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.round_trips += 1
+        return self._wrapped._commit(*args, **kwargs)
+
+
+class InstrumentedClient(_Proxy):
+    __slots__ = ()
+
+    def collection(self, *path):
+        return CollectionProxy(self._wrapped.collection(*path))
+
+    def document(self, *path):
+        return DocumentProxy(self._wrapped.document(*path))
+
+    def batch(self):
+        return WriteBatchProxy(self._wrapped.batch())
+
+    def transaction(self, **kwargs):
+        return TransactionProxy(self._wrapped.transaction(**kwargs))
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        references = [_unwrap(reference) for reference in references]
+        stats = current_stats()
+        if stats is not None:
+            stats.round_trips += 1
+        for snapshot in self._wrapped.get_all(references, field_paths=field_paths, transaction=_unwrap(transaction)):
+            if stats is not None:
+                stats.reads += 1
+                stats.documents[snapshot.reference.path] += 1
+            yield DocumentSnapshotProxy(snapshot)
+
+
+# Endpoints that return a whole collection by design; their reads grow with
+# the club, so only their write and round-trip budgets are checked
+FULL_SCAN_BUDGETS = {
+    endpoint: {'reads': None} for endpoint in (
+        'leaderboard.get_leaderboard_info',
+        'dashboard.get_admin_dashboard_info',
+        'users.get_all_users',
+        'users.export_collection',
+        'projects.get_all_projects',
+        'projects.get_approved_projects',
+        'posts.get_all_posts',
+        'polls.get_polls',
+    )
+}
+
+
+def init_request_accounting(app):
+    """
+    Wrap `app.config['db']` and report each request's data-store traffic.
+    Counts go out as X-Datastore-* headers when the app is in debug mode
+    or DATASTORE_DEBUG_HEADERS is set. A warning is logged when a request
+    goes over its endpoint's budget or reads the same document twice.
+
+    Budgets default to the DATASTORE_*_BUDGET settings, except for the
+    FULL_SCAN_BUDGETS endpoints, and can be set per endpoint with
+    `app.config['DATASTORE_BUDGETS'] = {'posts.get_posts': {'reads': 50}}`;
+    a limit of None turns that check off.
+    """
+    if not isinstance(app.config['db'], InstrumentedClient):
+        app.config['db'] = InstrumentedClient(app.config['db'])
+
+    default_budget = {
+        'reads': Config.DATASTORE_READ_BUDGET,
+        'writes': Config.DATASTORE_WRITE_BUDGET,
+        'round_trips': Config.DATASTORE_ROUND_TRIP_BUDGET,
+    }
+
+    @app.before_request
+    def start_datastore_accounting():
+        g.datastore_stats = RequestStats()
+
+    @app.after_request
+    def report_datastore_accounting(response):
+        stats = g.pop('datastore_stats', None)
+        if stats is None:
+            return response
+
+        if app.debug or app.config.get('DATASTORE_DEBUG_HEADERS', Config.DATASTORE_DEBUG_HEADERS):
+            for key, value in stats.as_dict().items():
+                response.headers[HEADER_PREFIX + key.replace('_', '-').title()] = str(value)
+
+        endpoint = request.endpoint or request.path
+        budget = (default_budget | FULL_SCAN_BUDGETS.get(endpoint, {})
+                  | app.config.get('DATASTORE_BUDGETS', {}).get(endpoint, {}))
+        counts = stats.as_dict()
+        over = [
+            f'{key}={counts[key]} (budget {limit})' for key, limit in budget.items()
+            if limit is not None and counts[key] > limit
+        ]
+        if over:
+            current_app.logger.warning(f"{endpoint} is over its datastore budget: {', '.join(over)}")
+
+        repeated = stats.repeated_reads()
+        if repeated:
+            paths = ', '.join(f'{path} x{count}' for path, count in sorted(repeated.items()))
+            current_app.logger.warning(f'{endpoint} read the same documents more than once: {paths}')
+
+        return response
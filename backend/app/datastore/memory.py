@@ -0,0 +1,667 @@
+import datetime
+import itertools
+import random
+import string
+import threading
+from google.api_core import exceptions
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.base_query import BaseQuery
+
+'''
+In-memory stand-in for `firestore.Client`.
+
+Implements the subset of the client API the blueprints use, with the
+same call shapes, so `create_app({'db': MemoryFirestore()})` runs every
+handler without a Firebase project:
+
+    collection / document / add / get / set(merge) / update / delete,
+    where / order_by / limit / select / start_after / stream / get,
+    batch, transaction (works with @firestore.transactional), get_all,
+    on_snapshot, and the SERVER_TIMESTAMP, DELETE_FIELD, Increment,
+    ArrayUnion and ArrayRemove sentinels.
+
+Documents are plain dicts keyed by collection path. Every write bumps a
+per-document version, which transactions use for optimistic concurrency.
+'''
+
+DOCUMENT_ID = '__name__'
+_AUTO_ID_CHARS = string.ascii_letters + string.digits
+
+
+def _auto_id():
+    return ''.join(random.choices(_AUTO_ID_CHARS, k=20))
+
+
+def _now():
+    return DatetimeWithNanoseconds.now(datetime.timezone.utc)
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _type_rank(value):
+    # Firestore's cross-type ordering: null < bool < number < timestamp < string < bytes < reference < array < map
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime.datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, DocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    return 9
+
+
+def _sort_key(value):
+    if isinstance(value, DocumentReference):
+        return (6, value.path)
+    if isinstance(value, list):
+        return (8, [_sort_key(v) for v in value])
+    if isinstance(value, dict):
+        return (9, sorted((k, _sort_key(v)) for k, v in value.items()))
+    if isinstance(value, datetime.datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return (_type_rank(value), value)
+
+
+_MISSING = object()
+
+
+def _get_field(data, field_path):
+    value = data
+    for part in field_path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _apply(target, updates, now):
+    """Apply `updates` (which may contain sentinels and transforms) onto `target` in place."""
+    for key, value in updates.items():
+        if value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        elif value is transforms.SERVER_TIMESTAMP:
+            target[key] = now
+        elif isinstance(value, transforms.Increment):
+            current = target.get(key)
+            target[key] = (current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0) + value.value
+        elif isinstance(value, transforms.Maximum):
+            current = target.get(key)
+            target[key] = value.value if not isinstance(current, (int, float)) else max(current, value.value)
+        elif isinstance(value, transforms.Minimum):
+            current = target.get(key)
+            target[key] = value.value if not isinstance(current, (int, float)) else min(current, value.value)
+        elif isinstance(value, transforms.ArrayUnion):
+            current = list(target.get(key) or []) if isinstance(target.get(key), list) else []
+            for item in value.values:
+                if item not in current:
+                    current.append(_copy(item))
+            target[key] = current
+        elif isinstance(value, transforms.ArrayRemove):
+            current = target.get(key) if isinstance(target.get(key), list) else []
+            target[key] = [item for item in current if item not in value.values]
+        elif isinstance(value, dict):
+            nested = target.get(key)
+            nested = dict(nested) if isinstance(nested, dict) else {}
+            _apply(nested, value, now)
+            target[key] = nested
+        else:
+            target[key] = _copy(value)
+
+
+def _set_path(target, field_path, value, now):
+    """`update()` treats dotted keys as nested field paths."""
+    parts = field_path.split('.')
+    for part in parts[:-1]:
+        nested = target.get(part)
+        nested = dict(nested) if isinstance(nested, dict) else {}
+        target[part] = nested
+        target = nested
+    _apply(target, {parts[-1]: value}, now)
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data, field_paths=None, version=0):
+        self.reference = reference
+        self._data = data
+        self._field_paths = field_paths
+        self._version = version
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        if self._field_paths is None:
+            return _copy(self._data)
+        projected = {}
+        for field_path in self._field_paths:
+            value = _get_field(self._data, field_path)
+            if value is not _MISSING:
+                _set_path(projected, field_path, _copy(value), None)
+        return projected
+
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return _copy(value)
+
+
+class DocumentReference:
+    def __init__(self, client, collection_path, doc_id):
+        self._client = client
+        self._collection_path = collection_path
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f'{self._collection_path}/{self.id}'
+
+    @property
+    def parent(self):
+        return CollectionReference(self._client, self._collection_path)
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def collection(self, name):
+        return CollectionReference(self._client, f'{self.path}/{name}')
+
+    def get(self, field_paths=None, transaction=None):
+        snapshot = self._client._read(self, field_paths)
+        if transaction is not None:
+            transaction._record_read(snapshot)
+        return snapshot
+
+    def set(self, document_data, merge=False):
+        self._client._commit([('set', self, document_data, merge)])
+
+    def create(self, document_data):
+        self._client._commit([('create', self, document_data, False)])
+
+    def update(self, field_updates):
+        self._client._commit([('update', self, field_updates, False)])
+
+    def delete(self):
+        self._client._commit([('delete', self, None, False)])
+
+    def on_snapshot(self, callback):
+        return self._client._watch(self._collection_path, callback, document_id=self.id)
+
+
+class Query:
+    ASCENDING = BaseQuery.ASCENDING
+    DESCENDING = BaseQuery.DESCENDING
+
+    def __init__(self, client, collection_path, filters=(), orders=(), limit=None,
+                 projection=None, cursor=None):
+        self._client = client
+        self._collection_path = collection_path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._projection = projection
+        self._cursor = cursor
+
+    def _copy_with(self, **changes):
+        params = {
+            'filters': self._filters,
+            'orders': self._orders,
+            'limit': self._limit,
+            'projection': self._projection,
+            'cursor': self._cursor,
+        }
+        params.update(changes)
+        return Query(self._client, self._collection_path, **params)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy_with(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy_with(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy_with(limit=count)
+
+    def select(self, field_paths):
+        return self._copy_with(projection=list(field_paths))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy_with(cursor=document_fields_or_snapshot)
+
+    def _matches(self, doc_id, data):
+        for field_path, op, expected in self._filters:
+            value = doc_id if field_path == DOCUMENT_ID else _get_field(data, field_path)
+            if value is _MISSING:
+                return False
+            if op == '==':
+                ok = value == expected
+            elif op == '!=':
+                ok = value is not None and value != expected
+            elif op == 'in':
+                ok = value in expected
+            elif op == 'not-in':
+                ok = value is not None and value not in expected
+            elif op == 'array_contains':
+                ok = isinstance(value, list) and expected in value
+            elif op == 'array_contains_any':
+                ok = isinstance(value, list) and any(item in value for item in expected)
+            elif op in ('<', '<=', '>', '>='):
+                if _type_rank(value) != _type_rank(expected):
+                    return False
+                a, b = _sort_key(value), _sort_key(expected)
+                ok = {'<': a < b, '<=': a <= b, '>': a > b, '>=': a >= b}[op]
+            else:
+                raise ValueError(f'Unsupported operator {op!r}')
+            if not ok:
+                return False
+        return True
+
+    def _effective_orders(self):
+        orders = list(self._orders)
+        # Like Firestore, an inequality filter orders by its field first
+        if not orders:
+            for field_path, op, _ in self._filters:
+                if op in ('<', '<=', '>', '>=', '!=', 'not-in'):
+                    orders.append((field_path, self.ASCENDING))
+                    break
+        if DOCUMENT_ID not in [field for field, _ in orders]:
+            last_direction = orders[-1][1] if orders else self.ASCENDING
+            orders.append((DOCUMENT_ID, last_direction))
+        return orders
+
+    def _cursor_values(self, orders):
+        cursor = self._cursor
+        if isinstance(cursor, DocumentSnapshot):
+            data = cursor._data or {}
+            return [
+                cursor.id if field == DOCUMENT_ID else _get_field(data, field)
+                for field, _ in orders
+            ]
+        values = []
+        for field, _ in orders:
+            value = cursor.get(field, _MISSING)
+            if isinstance(value, DocumentReference):
+                value = value.id
+            values.append(value)
+        return values
+
+    def _execute(self):
+        orders = self._effective_orders()
+        rows = []
+        for doc_id, version, data in self._client._scan(self._collection_path):
+            if not self._matches(doc_id, data):
+                continue
+            key = []
+            skip = False
+            for field, direction in orders:
+                value = doc_id if field == DOCUMENT_ID else _get_field(data, field)
+                if value is _MISSING:
+                    # Firestore leaves out documents that lack an ordered field
+                    skip = True
+                    break
+                key.append(_sort_key(value))
+            if not skip:
+                rows.append((key, doc_id, version, data))
+
+        # Stable multi-key sort, applied from the last order to the first
+        for index in range(len(orders) - 1, -1, -1):
+            reverse = orders[index][1] == self.DESCENDING
+            rows.sort(key=lambda row: row[0][index], reverse=reverse)
+
+        if self._cursor is not None:
+            cursor_key = []
+            for value in self._cursor_values(orders):
+                if value is _MISSING:
+                    break
+                cursor_key.append(_sort_key(value))
+
+            def after_cursor(row):
+                for index, cursor_value in enumerate(cursor_key):
+                    value = row[0][index]
+                    if value == cursor_value:
+                        continue
+                    if orders[index][1] == self.DESCENDING:
+                        return value < cursor_value
+                    return value > cursor_value
+                return False
+
+            rows = [row for row in rows if after_cursor(row)]
+
+        if self._limit is not None:
+            rows = rows[:self._limit]
+
+        self._client._count('query', len(rows))
+        return [
+            DocumentSnapshot(
+                DocumentReference(self._client, self._collection_path, doc_id),
+                data, self._projection, version
+            )
+            for _, doc_id, version, data in rows
+        ]
+
+    def stream(self, transaction=None):
+        snapshots = self._execute()
+        if transaction is not None:
+            for snapshot in snapshots:
+                transaction._record_read(snapshot)
+        return iter(snapshots)
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction=transaction))
+
+
+class CollectionReference(Query):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self._path = path
+
+    @property
+    def id(self):
+        return self._path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self):
+        parts = self._path.split('/')
+        if len(parts) < 3:
+            return None
+        return DocumentReference(self._client, '/'.join(parts[:-2]), parts[-2])
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._path, document_id or _auto_id())
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        ref.create(document_data)
+        return _now(), ref
+
+    def list_documents(self):
+        return [self.document(doc_id) for doc_id, _, _ in self._client._scan(self._path)]
+
+    def on_snapshot(self, callback):
+        return self._client._watch(self._path, callback)
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+        return self
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+        return self
+
+    def update(self, reference, field_updates):
+        self._writes.append(('update', reference, field_updates, False))
+        return self
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+        return self
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        self._client._commit(writes)
+        return []
+
+
+class Transaction(WriteBatch):
+    """
+    Optimistic transaction: remembers the version of every document it
+    read and aborts at commit if any of them changed, which makes
+    `@firestore.transactional` retry the function.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, client, max_attempts=5, read_only=False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+        self._reads = {}
+
+    @property
+    def in_progress(self):
+        return self._id is not None
+
+    def _record_read(self, snapshot):
+        self._reads.setdefault(snapshot.reference.path, snapshot._version)
+
+    def _clean_up(self):
+        self._writes = []
+        self._reads = {}
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._id = next(self._ids)
+
+    def _rollback(self):
+        self._clean_up()
+
+    def _commit(self):
+        writes, reads = self._writes, self._reads
+        self._clean_up()
+        self._client._commit(writes, expected_versions=reads)
+        return []
+
+
+class _Watch:
+    def __init__(self, client, collection_path, callback, document_id=None):
+        self._client = client
+        self._collection_path = collection_path
+        self._document_id = document_id
+        self._callback = callback
+        self.is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+        self._client._unwatch(self)
+
+    close = unsubscribe
+
+
+class _ChangeType:
+    def __init__(self, name):
+        self.name = name
+
+
+class _DocumentChange:
+    def __init__(self, type_name, document):
+        self.type = _ChangeType(type_name)
+        self.document = document
+
+
+class MemoryFirestore:
+    """
+    Thread-safe, process-local Firestore look-alike. `stats` counts the
+    document reads, writes and queries served, for benchmarks.
+    """
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.RLock()
+        self._watches = []
+        self.stats = {'reads': 0, 'writes': 0, 'queries': 0, 'commits': 0}
+
+    def _count(self, kind, docs):
+        with self._lock:
+            if kind == 'query':
+                self.stats['queries'] += 1
+            self.stats['reads'] += max(docs, 1) if kind == 'query' else docs
+
+    # Client API
+
+    def collection(self, collection_path):
+        return CollectionReference(self, collection_path)
+
+    def document(self, document_path):
+        collection_path, doc_id = document_path.rsplit('/', 1)
+        return DocumentReference(self, collection_path, doc_id)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self, max_attempts=5, read_only=False):
+        return Transaction(self, max_attempts, read_only)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference.get(field_paths=field_paths, transaction=transaction)
+
+    def collections(self):
+        with self._lock:
+            return [CollectionReference(self, path) for path in self._collections if '/' not in path]
+
+    def close(self):
+        pass
+
+    # Storage
+
+    def _read(self, reference, field_paths=None):
+        with self._lock:
+            self.stats['reads'] += 1
+            entry = self._collections.get(reference._collection_path, {}).get(reference.id)
+        if entry is None:
+            return DocumentSnapshot(reference, None, field_paths, 0)
+        version, data = entry
+        return DocumentSnapshot(reference, data, field_paths, version)
+
+    def _scan(self, collection_path):
+        with self._lock:
+            docs = self._collections.get(collection_path, {})
+            return [(doc_id, version, data) for doc_id, (version, data) in docs.items()]
+
+    def _commit(self, writes, expected_versions=None):
+        now = _now()
+        changes = []
+        with self._lock:
+            for path, version in (expected_versions or {}).items():
+                collection_path, doc_id = path.rsplit('/', 1)
+                current = self._collections.get(collection_path, {}).get(doc_id)
+                if (current[0] if current else 0) != version:
+                    raise exceptions.Aborted(f'Transaction contention on {path}')
+
+            # Validate before applying anything so a batch is all-or-nothing
+            staged = {}
+            for op, reference, data, merge in writes:
+                key = (reference._collection_path, reference.id)
+                if key in staged:
+                    current = staged[key]
+                else:
+                    entry = self._collections.get(reference._collection_path, {}).get(reference.id)
+                    current = entry[1] if entry else None
+
+                if op == 'create':
+                    if current is not None:
+                        raise exceptions.Conflict(f'Document already exists: {reference.path}')
+                    new = {}
+                    _apply(new, data, now)
+                elif op == 'set':
+                    new = dict(current) if (merge and current is not None) else {}
+                    _apply(new, data, now)
+                elif op == 'update':
+                    if current is None:
+                        raise exceptions.NotFound(f'No document to update: {reference.path}')
+                    new = dict(current)
+                    for field_path, value in data.items():
+                        _set_path(new, field_path, value, now)
+                else:
+                    new = None
+                staged[key] = new
+
+            for (collection_path, doc_id), new in staged.items():
+                docs = self._collections.setdefault(collection_path, {})
+                previous = docs.get(doc_id)
+                version = (previous[0] if previous else 0) + 1
+                if new is None:
+                    if previous is not None:
+                        del docs[doc_id]
+                        changes.append(('REMOVED', collection_path, doc_id, version, previous[1]))
+                else:
+                    docs[doc_id] = (version, new)
+                    changes.append(('MODIFIED' if previous else 'ADDED', collection_path, doc_id, version, new))
+
+            self.stats['writes'] += len(writes)
+            self.stats['commits'] += 1
+            watches = list(self._watches)
+
+        self._notify(watches, changes)
+
+    # Listeners
+
+    def _watch(self, collection_path, callback, document_id=None):
+        """
+        Listen to a collection, or with `document_id` to one document of
+        it. Document listeners get a single snapshot, which does not exist
+        once the document is deleted, like the Firestore client's.
+        """
+        watch = _Watch(self, collection_path, callback, document_id)
+        with self._lock:
+            self._watches.append(watch)
+            docs = self._collections.get(collection_path, {})
+            if document_id is not None:
+                version, data = docs.get(document_id, (0, None))
+                snapshot = DocumentSnapshot(DocumentReference(self, collection_path, document_id), data, None, version)
+                initial = [_DocumentChange('ADDED', snapshot)] if data is not None else []
+                documents = [snapshot]
+            else:
+                initial = [
+                    _DocumentChange('ADDED', DocumentSnapshot(DocumentReference(self, collection_path, doc_id), data, None, version))
+                    for doc_id, (version, data) in docs.items()
+                ]
+                documents = [change.document for change in initial]
+        callback(documents, initial, _now())
+        return watch
+
+    def _unwatch(self, watch):
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _notify(self, watches, changes):
+        for watch in watches:
+            relevant = [
+                _DocumentChange(type_name, DocumentSnapshot(
+                    DocumentReference(self, collection_path, doc_id), data, None, version))
+                for type_name, collection_path, doc_id, version, data in changes
+                if collection_path == watch._collection_path
+                and watch._document_id in (None, doc_id)
+            ]
+            if not relevant or not watch.is_active:
+                continue
+            documents = [change.document for change in relevant]
+            if watch._document_id is not None and relevant[-1].type.name == 'REMOVED':
+                documents = [DocumentSnapshot(relevant[-1].document.reference, None, None, relevant[-1].document._version)]
+            watch._callback(documents, relevant, _now())
@@ -0,0 +1,66 @@
+import os
+import threading
+from app.config import Config
+
+'''
+Firebase Admin and Firestore are set up on first use, once per process.
+
+The Firestore client holds gRPC channels that do not survive fork(), so
+it must never be created in a pre-forking server's master. Clients are
+remembered with the pid that created them and rebuilt in a child that
+inherited one.
+'''
+
+_lock = threading.Lock()
+_firebase_app = None
+_firebase_pid = None
+_db = None
+_db_pid = None
+
+
+def get_firebase_app():
+    global _firebase_app, _firebase_pid
+    if _firebase_app is not None and _firebase_pid == os.getpid():
+        return _firebase_app
+
+    with _lock:
+        if _firebase_app is None or _firebase_pid != os.getpid():
+            import firebase_admin
+            from firebase_admin import credentials
+
+            try:
+                # Already initialized in this interpreter, e.g. before a fork
+                _firebase_app = firebase_admin.get_app()
+            except ValueError:
+                cred = credentials.Certificate(Config.FIREBASE_CREDENTIALS)
+                _firebase_app = firebase_admin.initialize_app(cred)
+            _firebase_pid = os.getpid()
+    return _firebase_app
+
+
+def get_firestore_client():
+    global _db, _db_pid
+    if _db is not None and _db_pid == os.getpid():
+        return _db
+
+    firebase_app = get_firebase_app()
+    with _lock:
+        if _db is None or _db_pid != os.getpid():
+            from firebase_admin import firestore
+            _db = firestore.client(firebase_app)
+            _db_pid = os.getpid()
+    return _db
+
+
+class LazyFirestoreClient:
+    """
+    Stand-in stored in `app.config['db']` that creates this process's
+    Firestore client on first use and forwards every attribute to it,
+    so handlers keep using `current_app.config['db']` unchanged.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_firestore_client(), name)
+
+    def __repr__(self):
+        return '<LazyFirestoreClient>'
@@ -0,0 +1,68 @@
+import base64
+import datetime
+import orjson
+from flask.json.provider import DefaultJSONProvider
+from google.cloud.firestore_v1 import DocumentReference, GeoPoint
+from app.datastore import memory
+
+'''
+App-wide JSON provider built on orjson.
+
+Handlers keep calling jsonify with raw Firestore documents; the
+provider encodes the Firestore value types the same way everywhere:
+
+    timestamps          ISO 8601 in UTC, e.g. "2025-03-01T09:30:00.123456Z"
+    GeoPoint            {"latitude": ..., "longitude": ...}
+    DocumentReference   the document path, e.g. "Users/abc123"
+
+Keys stay sorted like Flask's default provider, and debug mode still
+pretty-prints. Anything orjson cannot encode falls back to Flask's
+default handling (dates, decimals, UUIDs, dataclasses).
+'''
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+def _default(value):
+    if isinstance(value, datetime.datetime):
+        # DatetimeWithNanoseconds is a subclass, which orjson does not serialize itself
+        return datetime.datetime(
+            value.year, value.month, value.day, value.hour, value.minute, value.second,
+            value.microsecond, tzinfo=value.tzinfo
+        )
+    if isinstance(value, GeoPoint):
+        return {'latitude': value.latitude, 'longitude': value.longitude}
+    if isinstance(value, (DocumentReference, memory.DocumentReference)):
+        return value.path
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    return DefaultJSONProvider.default(value)
+
+
+class FirestoreJSONProvider(DefaultJSONProvider):
+    def _options(self, pretty=False):
+        options = OPTIONS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Options orjson has no equivalent for, e.g. a custom separator
+            kwargs.setdefault('default', _default)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        # Straight to bytes, skipping the str round trip of the default provider
+        body = orjson.dumps(obj, default=_default, option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
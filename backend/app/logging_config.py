@@ -0,0 +1,159 @@
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from app.config import Config
+
+'''
+Structured, non-blocking logging.
+
+Request threads only put records on an in-memory queue; a QueueListener
+thread formats them as one JSON object per line and writes them out, so
+a slow stdout never stalls a request. Records logged during a request
+carry its method, path and endpoint. Below WARNING, records (including
+the per-request access log) are sampled per endpoint with LOG_SAMPLE_RATE
+and LOG_SAMPLE_RATES; warnings and errors are always kept.
+'''
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+_REQUEST_FIELDS = ('method', 'path', 'endpoint')
+
+_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+_queue = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestQueueHandler(QueueHandler):
+    """
+    Does the minimum on the calling thread: drop sampled-out records,
+    copy the request fields onto the record and resolve the message.
+    """
+
+    def __init__(self, log_queue, default_rate):
+        super().__init__(log_queue)
+        self.default_rate = default_rate
+
+    def _sampled_out(self, record):
+        if record.levelno >= logging.WARNING:
+            return False
+        rate = g.get('log_sample_rate', self.default_rate)
+        return rate < 1 and random.random() >= rate
+
+    def emit(self, record):
+        if has_request_context():
+            if self._sampled_out(record):
+                return
+            for field in _REQUEST_FIELDS:
+                if not hasattr(record, field):
+                    setattr(record, field, getattr(request, field))
+        super().emit(record)
+
+    def prepare(self, record):
+        # Same-process queue, so no pickling: keep extra fields as they are
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_sample_rates(value):
+    """'endpoint=0.1,other.endpoint=0.5' -> {'endpoint': 0.1, 'other.endpoint': 0.5}"""
+    rates = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            endpoint, rate = item.split('=', 1)
+            rates[endpoint.strip()] = float(rate)
+    return rates
+
+
+def _ensure_listener():
+    """Start this process's writer thread; threads do not survive a fork."""
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    with _lock:
+        if _listener is None or _listener_pid != os.getpid():
+            output = logging.StreamHandler(sys.stdout)
+            output.setFormatter(JsonFormatter())
+            _listener = QueueListener(_queue, output, respect_handler_level=False)
+            _listener.start()
+            _listener_pid = os.getpid()
+            # Flush what is still queued when the worker exits
+            atexit.register(_stop_listener)
+
+
+def _stop_listener():
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+
+
+def init_logging(app):
+    """
+    Route the root logger (and with it `app.logger` and every module
+    logger) through the queue, and log one access line per request.
+    """
+    global _queue
+    sample_rates = parse_sample_rates(Config.LOG_SAMPLE_RATES) | app.config.get('LOG_SAMPLE_RATES', {})
+    default_rate = app.config.get('LOG_SAMPLE_RATE', Config.LOG_SAMPLE_RATE)
+
+    if _queue is None:
+        _queue = queue.SimpleQueue()
+    handler = RequestQueueHandler(_queue, default_rate)
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, RequestQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(Config.LOG_LEVEL)
+
+    # Flask's own stderr handler would write synchronously and twice
+    from flask.logging import default_handler
+    app.logger.removeHandler(default_handler)
+
+    _ensure_listener()
+
+    access_logger = logging.getLogger('app.access')
+
+    @app.before_request
+    def start_request_logging():
+        _ensure_listener()
+        g.log_sample_rate = sample_rates.get(request.endpoint, default_rate)
+        g.log_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        started = g.get('log_started')
+        if started is not None:
+            access_logger.info('request', extra={
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+        return response
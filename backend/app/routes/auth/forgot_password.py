@@ -1,20 +1,22 @@
 from flask import Blueprint, request, jsonify
-import requests
 from app.routes.utils.user_verifier_func import get_current_user
 from app.routes.auth.bp import auth_bp
-from app.config import Config
+from app.routes.utils.rate_limit import rate_limited
+from app.routes.utils.http_client import identitytoolkit, UpstreamUnavailable
 
 
 
 @auth_bp.route('/forgotpassword', methods=['POST'])
+@rate_limited('forgotpassword')
 def forgot_password():
     data = request.get_json()
     email = data.get("email")
-    url = f"https://identitytoolkit.googleapis.com/v1/accounts:sendOobCode?key={Config.FIREBASE_API_KEY}"
     payload = {"requestType": "PASSWORD_RESET", "email": email}
-    
-    res = requests.post(url, json=payload)
-    result = res.json()
+
+    try:
+        result = identitytoolkit('sendOobCode', payload)
+    except UpstreamUnavailable:
+        return jsonify({"msg": "Authentication service is unavailable, please try again"}), 503
     
     if "error" in result:
         return jsonify({"msg": "Error sending password reset email", "error": result["error"]}), 400
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify, make_response
-import requests
 import datetime
 from firebase_admin import auth
 from app.routes.auth.bp import auth_bp
-from app.config import Config
+from app.routes.utils.rate_limit import rate_limited
+from app.routes.utils.http_client import identitytoolkit, UpstreamUnavailable
+from app.routes.utils.metrics import time_upstream
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limited('login')
 def login_user():
     try:
         data = request.get_json()
@@ -17,11 +19,8 @@ def login_user():
             return jsonify({"msg": "Email and password are required"}), 400
         
         '''Verify User Credentials with Firebase Auth REST API'''
-        url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={Config.FIREBASE_API_KEY}"
-
         payload = {"email": email, "password": password, "returnSecureToken": True}
-        r = requests.post(url, json=payload)
-        res_data = r.json()
+        res_data = identitytoolkit('signInWithPassword', payload)
 
         if "error" in res_data:
             return jsonify({"msg": res_data["error"]["message"]}), 401
@@ -30,7 +29,8 @@ def login_user():
 
         '''Create a Session Cookie'''
         expires_in = datetime.timedelta(days=7)
-        session_cookie = auth.create_session_cookie(id_token, expires_in=expires_in)
+        with time_upstream('firebase_auth', 'create_session_cookie'):
+            session_cookie = auth.create_session_cookie(id_token, expires_in=expires_in)
 
         response = make_response(jsonify({
             "message": "Login successful"
@@ -48,5 +48,7 @@ def login_user():
 
         return response
 
+    except UpstreamUnavailable:
+        return jsonify({"msg": "Authentication service is unavailable, please try again"}), 503
     except Exception as e:
         return jsonify({"msg": "Internal server error", "error": str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import request, jsonify, make_response, current_app
 from firebase_admin import auth
 from app.routes.auth.bp import auth_bp
+from app.routes.utils.metrics import time_upstream
 
 
 @auth_bp.route('/logout', methods=['POST'])
@@ -9,8 +10,10 @@ def logout_user():
         session_cookie = request.cookies.get('session')
         if session_cookie:
             try:
-                decoded = auth.verify_session_cookie(session_cookie, check_revoked=False)
-                auth.revoke_refresh_tokens(decoded['uid'])
+                with time_upstream('firebase_auth', 'verify_session_cookie'):
+                    decoded = auth.verify_session_cookie(session_cookie, check_revoked=False)
+                with time_upstream('firebase_auth', 'revoke_refresh_tokens'):
+                    auth.revoke_refresh_tokens(decoded['uid'])
             except auth.InvalidSessionCookieError:
                 current_app.logger.warning("Invalid session cookie received during logout.")
             except Exception:
@@ -3,8 +3,12 @@ from werkzeug.security import check_password_hash
 from firebase_admin import auth
 from app.routes.utils.user_verifier_func import get_current_user
 from app.routes.auth.bp import auth_bp
+from app.routes.utils.rate_limit import rate_limited
+from app.routes.utils.metrics import time_upstream
+from app.routes.utils.member_index import index_member
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limited('register')
 def register_user():
     try:
         data = request.get_json()
@@ -15,21 +19,23 @@ def register_user():
         if not email or not password or not username:
             return jsonify({'msg': 'Email, password and Name are required'}), 400
         
-        user = auth.create_user(
-            email=email,
-            password=password,
-            display_name=username
-        )
+        with time_upstream('firebase_auth', 'create_user'):
+            user = auth.create_user(
+                email=email,
+                password=password,
+                display_name=username
+            )
         uid = user.uid
 
-        auth.set_custom_user_claims(uid, {'role': 'member', 'is_admin': False})
+        with time_upstream('firebase_auth', 'set_custom_user_claims'):
+            auth.set_custom_user_claims(uid, {'role': 'member', 'is_admin': False})
         db = current_app.config['db']
-        user_ref = db.collection('users').document(uid)
+        user_ref = db.collection('Users').document(uid)
 
         if user_ref.get().exists:
             return jsonify({'msg': 'User already exists'}), 400
         
-        user_ref.set({
+        profile = {
             'email': email,
             'name': username,
             'role': 'member',
@@ -38,7 +44,9 @@ def register_user():
             "is_admin": False,
             'committee': 'Coding Club',
             'memo_tokens': 4
-        })
+        }
+        user_ref.set(profile)
+        index_member(uid, profile)
 
         return jsonify({'msg': 'User registered sucessfully'}), 201
     
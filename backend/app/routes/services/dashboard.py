@@ -1,21 +1,24 @@
+import asyncio
 from flask import Blueprint, jsonify, current_app
-from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.user_verifier_func import get_current_user_async
+from app.datastore.aio import get_async_db
 from firebase_admin import firestore
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/dashboard', methods=['GET'])
-def get_dashboard_info():
+async def get_dashboard_info():
     try:
-        user = get_current_user()
+        user = await get_current_user_async()
         if not user:
             return jsonify({'msg': 'Unauthorized'}), 401
         
-        db = current_app.config['db']
+        db = get_async_db()
         
-        # Fetch user info
+        # Fetch user info and contributions together
         user_ref = db.collection('Users').document(user['uid'])
-        user_doc = user_ref.get()
+        contributions_ref = db.collection('contributions').where('uid', '==', user['uid'])
+        user_doc, contribution_docs = await asyncio.gather(user_ref.get(), contributions_ref.get())
 
         if not user_doc.exists:
             return jsonify({'msg': 'User not found'}), 404
@@ -30,10 +33,9 @@ def get_dashboard_info():
             'role': role
         }
 
-        contributions_ref = db.collection('contributions').where('uid', '==', user['uid'])
         contributions = [
             {'id': doc.id, **doc.to_dict()}
-            for doc in contributions_ref.stream()
+            for doc in contribution_docs
         ]
 
         return jsonify({
@@ -47,9 +49,9 @@ def get_dashboard_info():
 
 
 @dashboard_bp.route('/admin-dashboard', methods=['GET'])
-def get_admin_dashboard_info():
+async def get_admin_dashboard_info():
     try:
-        user = get_current_user()
+        user = await get_current_user_async()
         if not user:
             return jsonify({'msg': 'Unauthorized'}), 401
         
@@ -58,11 +60,26 @@ def get_admin_dashboard_info():
         if not is_admin:
             return jsonify({'msg': 'Access denied. Admin privileges required.'}), 403
         
-        db = current_app.config['db']
-        
-        # Fetch user info
-        user_ref = db.collection('Users').document(user['uid'])
-        user_doc = user_ref.get()
+        db = get_async_db()
+
+        async def count_active_polls():
+            # Optional: Count active polls if needed
+            try:
+                return await db.collection('polls').where('status', '==', 'Active').count()
+            except Exception:
+                return 0
+
+        # The user doc and all four counts are fetched together
+        user_doc, unapproved_projects_count, upcoming_events_count, total_members, active_polls_count = await asyncio.gather(
+            db.collection('Users').document(user['uid']).get(),
+            # 1. Count unapproved projects (is_approved == False)
+            db.collection('projects').where('is_approved', '==', False).count(),
+            # 2. Count upcoming events (status == 'upcoming')
+            db.collection('events').where('status', '==', 'upcoming').count(),
+            # 3. Count total number of members
+            db.collection('Users').count(),
+            count_active_polls()
+        )
 
         if not user_doc.exists:
             return jsonify({'msg': 'User not found'}), 404
@@ -70,34 +87,6 @@ def get_admin_dashboard_info():
         user_data = user_doc.to_dict()
         user_name = user_data.get('name', 'Admin')
 
-        # 1. Count unapproved projects (is_approved == False)
-        unapproved_projects_count = 0
-        projects_ref = db.collection('projects')
-        
-        # Check both 'is_approved' and 'approved' fields for compatibility
-        unapproved_query = projects_ref.where('is_approved', '==', False)
-        unapproved_projects_count = sum(1 for _ in unapproved_query.stream())
-
-        # 2. Count upcoming events (status == 'upcoming')
-        upcoming_events_count = 0
-        events_ref = db.collection('events')
-        upcoming_query = events_ref.where('status', '==', 'upcoming')
-        upcoming_events_count = sum(1 for _ in upcoming_query.stream())
-
-        # 3. Count total number of members
-        total_members = 0
-        members_ref = db.collection('Users')
-        total_members = sum(1 for _ in members_ref.stream())
-
-        # Optional: Count active polls if needed
-        active_polls_count = 0
-        try:
-            polls_ref = db.collection('polls')
-            active_polls_query = polls_ref.where('status', '==', 'Active')
-            active_polls_count = sum(1 for _ in active_polls_query.stream())
-        except Exception:
-            active_polls_count = 0
-
         return jsonify({
             'msg': 'Successfully fetched admin dashboard info',
             'is_admin': True,
@@ -111,5 +100,5 @@ def get_admin_dashboard_info():
         }), 200
     
     except Exception as e:
-        print(f"Admin dashboard error: {str(e)}")
+        current_app.logger.exception("Admin dashboard error")
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
\ No newline at end of file
@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.collection_mirror import mirror_where
 from firebase_admin import firestore
-import cloudinary.uploader
+from app.routes.utils.cloudinary_client import get_uploader
 
 bod_bp = Blueprint('bod', __name__)
 
@@ -11,8 +12,12 @@ def get_bod():
         db = current_app.config['db']
         user = get_current_user()
 
-        bod_ref = db.collection('bod').where('comittee', '==', 'BOD')
-        bod = [doc.to_dict() | {"id": doc.id} for doc in bod_ref.stream()]
+        rows = mirror_where('bod', 'comittee', 'BOD')
+        if rows is not None:
+            bod = [data | {"id": doc_id} for doc_id, data in rows]
+        else:
+            bod_ref = db.collection('bod').where('comittee', '==', 'BOD')
+            bod = [doc.to_dict() | {"id": doc.id} for doc in bod_ref.stream()]
 
         return jsonify({'msg': 'Successfully fetched BOD', 'bod': bod}), 200
 
@@ -39,7 +44,7 @@ def add_bod():
         # Upload image to Cloudinary
         image_url = ''
         if image_file:
-            upload_result = cloudinary.uploader.upload(image_file)
+            upload_result = get_uploader().upload(image_file)
             image_url = upload_result.get('secure_url', '')
 
         new_doc = db.collection('bod').document()
@@ -87,7 +92,7 @@ def edit_bod(uid):
 
         # Upload new image if provided
         if image_file:
-            upload_result = cloudinary.uploader.upload(image_file)
+            upload_result = get_uploader().upload(image_file)
             update_data['image'] = upload_result.get('secure_url', '')
 
         update_data['updated_at'] = firestore.SERVER_TIMESTAMP
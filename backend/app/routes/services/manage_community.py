@@ -1,45 +1,32 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.image_upload_queue import enqueue_image_upload, allowed_file, pending_image_fields
+from app.routes.utils.pagination import parse_page_args, paginate_query
+from app.routes.utils.cache import TTLCache
+from app.config import Config
 from firebase_admin import firestore
-import uuid
-from werkzeug.utils import secure_filename
-import os
 
 community_bp = Blueprint('community', __name__)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+SUMMARY_LENGTH = 280
+# Listing only needs the stored summary, never the full description
+LIST_FIELDS = ['title', 'summary', 'is_published', 'image_url', 'image_status', 'created_at', 'updated_at']
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+# Listing pages keyed by (limit, start_after) and single events keyed by id
+events_page_cache = TTLCache(ttl=Config.COMMUNITY_CACHE_TTL, max_entries=32)
+event_cache = TTLCache(ttl=Config.COMMUNITY_CACHE_TTL, max_entries=256)
 
 
-def upload_image_to_storage(file, folder='community_events'):
-    """Upload image to Cloudinary and return the public URL"""
-    try:
-        import cloudinary.uploader
-
-        if not file:
-            return None
-
-        # Generate a secure and unique filename
-        filename = secure_filename(file.filename)
-        unique_filename = f"{folder}/{uuid.uuid4()}_{filename}"
-
-        # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file,
-            public_id=unique_filename,
-            folder=folder,
-            resource_type="image",
-            overwrite=True
-        )
-
-        # Return the Cloudinary secure URL
-        return upload_result.get("secure_url")
-    except Exception as e:
-        print(f"Error uploading image to Cloudinary: {str(e)}")
-        return None
+def make_summary(description):
+    if len(description) <= SUMMARY_LENGTH:
+        return description
+    return description[:SUMMARY_LENGTH].rstrip() + '...'
+
 
+def invalidate_event(event_id=None):
+    events_page_cache.clear()
+    if event_id:
+        event_cache.delete(event_id)
 
 @community_bp.route('/events', methods=["GET"])
 def get_community_events():
@@ -48,18 +35,52 @@ def get_community_events():
         if not user:
             return jsonify({'msg': 'Unauthorized'}), 401
         
-        db = current_app.config['db']
-        community_ref = db.collection('community_events').order_by('created_at', direction=firestore.Query.DESCENDING)
-        events = []
-        
-        for doc in community_ref.stream():
-            event_data = doc.to_dict()
-            event_data['id'] = doc.id
-            events.append(event_data)
-
-        return jsonify({'msg': 'Successfully fetched community events', 'events': events}), 200
+        try:
+            limit, start_after = parse_page_args()
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        cache_key = (limit, start_after)
+        page = events_page_cache.get(cache_key)
+        if page is None:
+            db = current_app.config['db']
+            community_collection = db.collection('community_events')
+            community_ref = community_collection.order_by('created_at', direction=firestore.Query.DESCENDING).select(LIST_FIELDS)
+            try:
+                docs, next_page_token = paginate_query(community_ref, community_collection, limit, start_after)
+            except ValueError as e:
+                return jsonify({'msg': str(e)}), 400
+
+            events = []
+            legacy_ids = []
+            for doc in docs:
+                event_data = doc.to_dict()
+                event_data['id'] = doc.id
+                if event_data.get('summary') is None:
+                    legacy_ids.append(doc.id)
+                events.append(event_data)
+
+            # Events stored before summaries existed need their description once
+            if legacy_ids:
+                refs = [community_collection.document(event_id) for event_id in legacy_ids]
+                descriptions = {
+                    snap.id: snap.to_dict().get('description', '')
+                    for snap in db.get_all(refs, field_paths=['description']) if snap.exists
+                }
+                for event_data in events:
+                    if event_data['id'] in descriptions:
+                        event_data['summary'] = make_summary(descriptions[event_data['id']])
+
+            # Listing carries the summary in place of the description, /event/<id> has the full text
+            for event_data in events:
+                event_data['description'] = event_data.pop('summary', '') or ''
+
+            page = {'events': events, 'next_page_token': next_page_token}
+            events_page_cache.set(cache_key, page)
+
+        return jsonify({'msg': 'Successfully fetched community events', **page}), 200
     except Exception as e:
-        print(f"Error fetching events: {str(e)}")
+        current_app.logger.exception("Error fetching events")
         return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
 
 
@@ -80,12 +101,12 @@ def create_community_event():
         if not title or not description:
             return jsonify({'msg': 'Title and description are required'}), 400
 
-        # Handle image upload
-        image_url = None
+        # Image is uploaded in the background after the event is stored
+        image_file = None
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename != '' and allowed_file(file.filename):
-                image_url = upload_image_to_storage(file, 'community_events')
+                image_file = file
 
         # Create event in Firestore
         db = current_app.config['db']
@@ -95,19 +116,29 @@ def create_community_event():
             'id': community_ref.id,
             'title': title,
             'description': description,
+            'summary': make_summary(description),
             'is_published': is_published,
             'created_at': firestore.SERVER_TIMESTAMP,
             'updated_at': firestore.SERVER_TIMESTAMP
         }
         
-        if image_url:
-            event_data['image_url'] = image_url
+        if image_file:
+            event_data.update(pending_image_fields())
             
         community_ref.set(event_data)
+        invalidate_event()
 
-        return jsonify({'msg': 'Community event created successfully', 'event_id': community_ref.id}), 201
+        if image_file:
+            enqueue_image_upload(community_ref, image_file, 'community_events', event_data['image_upload_id'],
+                                 on_complete=lambda: invalidate_event(community_ref.id))
+
+        return jsonify({
+            'msg': 'Community event created successfully',
+            'event_id': community_ref.id,
+            'image_status': event_data.get('image_status')
+        }), 201
     except Exception as e:
-        print(f"Error creating event: {str(e)}")
+        current_app.logger.exception("Error creating event")
         return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
 
 
@@ -139,22 +170,31 @@ def update_community_event(event_id):
             update_data['title'] = title
         if description:
             update_data['description'] = description
+            update_data['summary'] = make_summary(description)
         
         update_data['is_published'] = is_published
 
-        # Handle image upload
+        # New image is uploaded in the background, the old one stays until it lands
+        image_file = None
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename != '' and allowed_file(file.filename):
-                image_url = upload_image_to_storage(file, 'community_events')
-                if image_url:
-                    update_data['image_url'] = image_url
+                image_file = file
+                update_data.update(pending_image_fields())
 
         community_ref.update(update_data)
+        invalidate_event(event_id)
+
+        if image_file:
+            enqueue_image_upload(community_ref, image_file, 'community_events', update_data['image_upload_id'],
+                                 on_complete=lambda: invalidate_event(event_id))
 
-        return jsonify({'msg': 'Community event updated successfully'}), 200
+        return jsonify({
+            'msg': 'Community event updated successfully',
+            'image_status': update_data.get('image_status')
+        }), 200
     except Exception as e:
-        print(f"Error updating event: {str(e)}")
+        current_app.logger.exception("Error updating event")
         return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
 
 
@@ -180,31 +220,35 @@ def delete_community_event(event_id):
             try:
                 pass  # You can add Cloudinary deletion logic if needed
             except Exception as img_err:
-                print(f"Error deleting image: {str(img_err)}")
+                current_app.logger.warning(f"Error deleting image: {str(img_err)}")
                 # Continue with event deletion even if image deletion fails
 
         community_ref.delete()
+        invalidate_event(event_id)
 
         return jsonify({'msg': 'Community event deleted successfully'}), 200
     except Exception as e:
-        print(f"Error deleting event: {str(e)}")
+        current_app.logger.exception("Error deleting event")
         return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
 
 
 @community_bp.route('/event/<event_id>', methods=["GET"])
 def get_community_event(event_id):
     try:
-        db = current_app.config['db']
-        community_ref = db.collection('community_events').document(event_id)
-        doc = community_ref.get()
-        
-        if not doc.exists:
-            return jsonify({'msg': 'Community event not found'}), 404
+        event_data = event_cache.get(event_id)
+        if event_data is None:
+            db = current_app.config['db']
+            community_ref = db.collection('community_events').document(event_id)
+            doc = community_ref.get()
 
-        event_data = doc.to_dict()
-        event_data['id'] = doc.id
+            if not doc.exists:
+                return jsonify({'msg': 'Community event not found'}), 404
+
+            event_data = doc.to_dict()
+            event_data['id'] = doc.id
+            event_cache.set(event_id, event_data)
 
         return jsonify({'msg': 'Successfully fetched community event', 'event': event_data}), 200
     except Exception as e:
-        print(f"Error fetching event: {str(e)}")
+        current_app.logger.exception("Error fetching event")
         return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
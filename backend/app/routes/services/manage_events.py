@@ -1,5 +1,10 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.pagination import parse_page_args, paginate_query
+from app.routes.utils.collection_mirror import mirror_where
+from app.routes.utils.event_time import parse_event_datetime, parse_range_bound, backfill_event_times, DATE_FORMAT_HINT
+from firebase_admin import firestore
+import datetime
 events_bp = Blueprint('events', __name__)
 
 @events_bp.route('/events')
@@ -11,13 +16,55 @@ def get_all_events():
         
         db = current_app.config['db']
         events_ref = db.collection('events')
-        events_list = [{'id': doc.id, **doc.to_dict()} for doc in events_ref.stream()]
 
-        events_by_date = []
-        for events in events_list:
-            events_by_date.append(events)
-        
-        return jsonify({'msg':'Sucessfully fetched all events', 'events': events_by_date}), 200
+        when = request.args.get('when')
+        between = request.args.get('between')
+
+        # Without a filter keep returning every event, now sorted by start time
+        if not when and not between:
+            rows = mirror_where('events')
+            if rows is not None:
+                events_list = [{'id': doc_id, **data} for doc_id, data in rows]
+            else:
+                events_list = [{'id': doc.id, **doc.to_dict()} for doc in events_ref.stream()]
+            far_future = datetime.datetime.max.replace(tzinfo=datetime.timezone.utc)
+            events_by_date = sorted(events_list, key=lambda e: e.get('starts_at') or far_future)
+            return jsonify({'msg':'Sucessfully fetched all events', 'events': events_by_date}), 200
+
+        try:
+            limit, start_after = parse_page_args()
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        # Range and order on the same field only need the automatic single-field index
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if between:
+            try:
+                start_str, end_str = between.split(',', 1)
+                start = parse_range_bound(start_str)
+                end = parse_range_bound(end_str, end_of_day=True)
+            except ValueError:
+                return jsonify({'msg': 'between must be "start,end" in ISO format'}), 400
+            query = events_ref.where('starts_at', '>=', start).where('starts_at', '<=', end) \
+                .order_by('starts_at')
+        elif when == 'upcoming':
+            query = events_ref.where('starts_at', '>=', now).order_by('starts_at')
+        elif when == 'past':
+            query = events_ref.where('starts_at', '<', now).order_by('starts_at', direction=firestore.Query.DESCENDING)
+        else:
+            return jsonify({'msg': 'when must be "upcoming" or "past"'}), 400
+
+        try:
+            docs, next_page_token = paginate_query(query, events_ref, limit, start_after)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        events_by_date = [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        return jsonify({
+            'msg': 'Sucessfully fetched events',
+            'events': events_by_date,
+            'next_page_token': next_page_token
+        }), 200
 
     except Exception as e:
         return jsonify({'msg': 'Internal Server error', 'error': str(e)}), 500
@@ -57,14 +104,19 @@ def add_event():
             if field not in data:
                 return jsonify({"error": f"Missing field: {field}"}), 400
         
+        starts_at = parse_event_datetime(data.get('date'), data.get('time'))
+        if starts_at is None:
+            return jsonify({"error": DATE_FORMAT_HINT}), 400
+
         doc_ref = db.collection('events').document() 
         doc_ref.set({
             "name": data.get("name"),
             "description": data.get('description'),
             "date": data.get('date'),
             "time": data.get('time'),
+            "starts_at": starts_at,
             "venue": data.get('venue'),
-            "status": "upcoming"
+            "status": "upcoming" if starts_at >= datetime.datetime.now(datetime.timezone.utc) else "past"
         })
 
         return jsonify({'msg':'Sucessfully created the event'}), 201
@@ -96,6 +148,20 @@ def edit_event(id):
         event_doc = doc_ref.get() 
         if not event_doc.exists:
             return jsonify({'msg': 'Missing event, event might have been deleted'}), 404
+
+        if 'date' in updated_info or 'time' in updated_info:
+            current = event_doc.to_dict()
+            starts_at = parse_event_datetime(
+                updated_info.get('date', current.get('date')),
+                updated_info.get('time', current.get('time'))
+            )
+            if starts_at is None:
+                return jsonify({"error": DATE_FORMAT_HINT}), 400
+            updated_info['starts_at'] = starts_at
+            # Rescheduling moves the event back to upcoming unless the admin set a status
+            if 'status' not in updated_info:
+                now = datetime.datetime.now(datetime.timezone.utc)
+                updated_info['status'] = 'upcoming' if starts_at >= now else 'past'
         
         doc_ref.update(updated_info)
         return jsonify({'msg':'Sucessfully updated the event'}), 200
@@ -122,3 +188,30 @@ def delete_event(id):
 
     except Exception as e:
         return jsonify({'msg': 'Internal Server error', 'error': str(e)}), 500
+
+
+@events_bp.route('/backfill-start-times', methods=["POST"])
+def backfill_start_times():
+    try:
+        user = get_current_user()
+        if not user or not user.get('is_admin', False):
+            return jsonify({'msg': 'Unauthorized User'}), 401
+
+        data = request.get_json(silent=True) or {}
+        try:
+            limit = max(1, min(int(data.get('limit', 200)), 450))
+        except (TypeError, ValueError):
+            return jsonify({'msg': 'Invalid limit'}), 400
+
+        db = current_app.config['db']
+        updated, unparseable, next_page_token = backfill_event_times(db, limit, data.get('start_after'))
+
+        return jsonify({
+            'msg': 'Sucessfully backfilled event start times',
+            'updated': updated,
+            'unparseable': unparseable,
+            'next_page_token': next_page_token
+        }), 200
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal Server error', 'error': str(e)}), 500
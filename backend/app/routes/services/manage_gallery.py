@@ -1,27 +1,28 @@
+import asyncio
 from flask import Blueprint, jsonify, request, current_app
-from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.user_verifier_func import get_current_user, get_current_user_async
+from app.datastore.aio import get_async_db, run_blocking
 from google.cloud import firestore
 from datetime import datetime
-import cloudinary
-import cloudinary.uploader
+from app.routes.utils.cloudinary_client import get_uploader
 import os
 
 gallery_bp = Blueprint("gallery", __name__)
 
 @gallery_bp.route("/create-memory", methods=["POST"])
-def create_memory():
+async def create_memory():
     try:
         # Auth
-        user = get_current_user()
+        user = await get_current_user_async()
         if not user:
             return jsonify({"msg": "Unauthorized user"}), 401
 
         uid = user.get("uid")
-        db = current_app.config["db"]
+        db = get_async_db()
 
         # Validate user doc
         user_ref = db.collection("Users").document(uid)
-        user_doc = user_ref.get()
+        user_doc = await user_ref.get()
         if not user_doc.exists:
             return jsonify({"msg": "User not found"}), 404
 
@@ -55,18 +56,15 @@ def create_memory():
             if ext not in allowed_extensions:
                 return jsonify({"msg": f"Invalid file type: {photo.filename}. Allowed types: {', '.join(allowed_extensions)}"}), 400
 
-        uploaded_files = []
-        failed = []
-
-        # Upload each photo to Cloudinary
-        for photo in photos:
+        def upload_photo(photo):
+            """Returns (file_info, None) on success or (None, failure)."""
             try:
                 original_filename = photo.filename
                 base_name = os.path.splitext(original_filename)[0]
                 timestamp = int(datetime.utcnow().timestamp())
                 public_id = f"memories/{uid}/{base_name}_{timestamp}"
                 
-                result = cloudinary.uploader.upload(
+                result = get_uploader().upload(
                     photo,
                     public_id=public_id,
                     folder="gallery_memories",
@@ -98,7 +96,7 @@ def create_memory():
                 optimized_url = result.get("eager", [{}])[0].get("secure_url", result.get("secure_url"))
                 
                 if result.get("secure_url"):
-                    uploaded_files.append({
+                    return {
                         "cloudinary_url": optimized_url or result["secure_url"],
                         "original_url": result["secure_url"],
                         "public_id": result["public_id"],
@@ -109,12 +107,16 @@ def create_memory():
                         "bytes": result.get("bytes"),
                         "original_name": original_filename,
                         "resource_type": result.get("resource_type"),
-                    })
-                else:
-                    failed.append({"source": original_filename, "reason": "No URL returned by Cloudinary"})
+                    }, None
+                return None, {"source": original_filename, "reason": "No URL returned by Cloudinary"}
                     
             except Exception as e:
-                failed.append({"source": photo.filename, "reason": str(e)})
+                return None, {"source": photo.filename, "reason": str(e)}
+
+        # Upload the photos to Cloudinary concurrently, keeping their order
+        results = await asyncio.gather(*(run_blocking(upload_photo, photo) for photo in photos))
+        uploaded_files = [file_info for file_info, _ in results if file_info]
+        failed = [failure for _, failure in results if failure]
 
         if not uploaded_files:
             return jsonify({"msg": "Upload failed for all photos", "failed": failed}), 400
@@ -124,7 +126,7 @@ def create_memory():
 
         # Store memory doc
         gallery_ref = db.collection("Gallery")
-        doc_ref = gallery_ref.add({
+        doc_ref = await gallery_ref.add({
             "title": title,
             "author": author,
             "author_id": uid,
@@ -136,13 +138,13 @@ def create_memory():
         memory_id = doc_ref[1].id
 
         # Deduct 1 token (atomic) and Increase the User Points
-        user_ref.update({
+        await user_ref.update({
             "points": 50,
             "memo_tokens": firestore.Increment(-1)
             })
 
         # Get updated memo tokens
-        updated_user_doc = user_ref.get()
+        updated_user_doc = await user_ref.get()
         updated_memo_tokens = updated_user_doc.to_dict().get("memo_tokens", 0) if updated_user_doc.exists else 0
 
         return jsonify({
@@ -166,39 +168,34 @@ def create_memory():
 
 
 @gallery_bp.route("/memories", methods=["GET"])
-def get_all_memories():
+async def get_all_memories():
     try:
-        user = get_current_user()
+        user = await get_current_user_async()
         if not user:
             return jsonify({"msg": "Unauthorized user"}), 401
 
         uid = user.get("uid")
-        db = current_app.config["db"]
+        db = get_async_db()
+
+        # Fetch memories
+        try:
+            gallery_ref = db.collection("Gallery").order_by("created_at", direction=firestore.Query.DESCENDING).limit(50)
+        except Exception:
+            gallery_ref = db.collection("Gallery").limit(50)
 
-        # Fetch user's memo tokens
+        # Fetch user's memo tokens together with the memories
         user_ref = db.collection("Users").document(uid)
-        user_doc = user_ref.get()
+        user_doc, memory_docs = await asyncio.gather(user_ref.get(), gallery_ref.get())
         
         memo_tokens = 0
         if user_doc.exists:
             user_data = user_doc.to_dict()
             memo_tokens = user_data.get("memo_tokens", 0)
 
-        # Fetch memories
-        try:
-            gallery_ref = db.collection("Gallery").order_by("created_at", direction=firestore.Query.DESCENDING).limit(50)
-        except Exception:
-            gallery_ref = db.collection("Gallery").limit(50)
-
         memories = []
-        for doc in gallery_ref.stream():
+        for doc in memory_docs:
             d = doc.to_dict()
             d["id"] = doc.id
-            if d.get("created_at"):
-                try:
-                    d["created_at"] = d["created_at"].strftime("%a, %d %b %Y %H:%M:%S GMT")
-                except Exception:
-                    d["created_at"] = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
             memories.append(d)
         
         return jsonify({
@@ -246,7 +243,7 @@ def delete_memory(memory_id):
             public_id = file_info.get("public_id")
             if public_id:
                 try:
-                    result = cloudinary.uploader.destroy(public_id, resource_type="image")
+                    result = get_uploader().destroy(public_id, resource_type="image")
                     if result.get("result") == "ok":
                         deleted_count += 1
                     else:
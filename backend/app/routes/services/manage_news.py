@@ -1,9 +1,17 @@
 from flask import Blueprint, jsonify, request, current_app
 from firebase_admin import firestore
 from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.pagination import parse_page_args, paginate_query, paginate_rows
+from app.routes.utils.collection_mirror import mirror_where
+from app.routes.utils.cache import TTLCache
+from app.routes.utils.image_upload_queue import enqueue_image_upload, allowed_file, pending_image_fields
+from app.config import Config
 
 news_bp = Blueprint('news', __name__)
 
+# Rendered public feed pages keyed by (limit, start_after), cleared on every edit
+news_cache = TTLCache(ttl=Config.NEWS_CACHE_TTL)
+
 @news_bp.route('/news', methods=['GET'])
 def get_all_news():
     """Public endpoint - Get all community news ordered by date"""
@@ -12,30 +20,53 @@ def get_all_news():
         if not user:
             return jsonify({'msg': 'Unauthorized'}), 401
         
-        db = current_app.config['db']
-        news_ref = db.collection('community_news').order_by('created_at', direction=firestore.Query.DESCENDING)
-        
-        news_list = []
-        for doc in news_ref.stream():
-            data = doc.to_dict()
-            news_item = {
-                "id": doc.id,
-                "title": data.get("title", "Untitled"),
-                "description": data.get("description", ""),
-                "image_url": data.get("image_url"),
-                "created_at": data.get("created_at")
-            }
-            # Only return published news to public
-            if data.get("is_published", True):
-                news_list.append(news_item)
-        
+        try:
+            limit, start_after = parse_page_args()
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        cache_key = (limit, start_after)
+        page = news_cache.get(cache_key)
+        if page is None:
+            # Mirror updates land after the edit handler has cleared the cache, so clear it again then
+            rows = mirror_where('community_news', 'is_published', True, on_change=news_cache.clear)
+            try:
+                if rows is not None:
+                    # Same order as the indexed query, which also leaves out docs without created_at
+                    rows = [row for row in rows if row[1].get('created_at') is not None]
+                    rows.sort(key=lambda row: row[1]['created_at'], reverse=True)
+                    rows, next_page_token = paginate_rows(rows, limit, start_after)
+                else:
+                    db = current_app.config['db']
+                    news_collection = db.collection('community_news')
+                    # Needs the composite index (is_published ASC, created_at DESC) in firestore.indexes.json
+                    news_ref = news_collection.where('is_published', '==', True).order_by('created_at', direction=firestore.Query.DESCENDING)
+                    docs, next_page_token = paginate_query(news_ref, news_collection, limit, start_after)
+                    rows = [(doc.id, doc.to_dict()) for doc in docs]
+            except ValueError as e:
+                return jsonify({'msg': str(e)}), 400
+
+            news_list = []
+            for doc_id, data in rows:
+                news_list.append({
+                    "id": doc_id,
+                    "title": data.get("title", "Untitled"),
+                    "description": data.get("description", ""),
+                    "image_url": data.get("image_url"),
+                    "image_status": data.get("image_status"),
+                    "created_at": data.get("created_at")
+                })
+
+            page = {'news': news_list, 'next_page_token': next_page_token}
+            news_cache.set(cache_key, page)
+
         return jsonify({
             'msg': 'Successfully fetched community news',
-            'news': news_list
+            **page
         }), 200
         
     except Exception as e:
-        print(f"Error in get_all_news: {str(e)}")
+        current_app.logger.exception("Error in get_all_news")
         return jsonify({
             'msg': 'Internal server error',
             'error': str(e)
@@ -58,25 +89,39 @@ def create_news():
         is_published_raw = request.form.get('is_published', 'true')
         is_published = is_published_raw.lower() in ('true', '1', 'yes')
 
+        image_file = request.files.get('image')
+        if image_file and (not image_file.filename or not allowed_file(image_file.filename)):
+            image_file = None
+
         if not title:
             return jsonify({'msg': 'Title cannot be empty'}), 400
         
         # Create news document
         news_ref = db.collection('community_news').document()
-        news_ref.set({
+        news_data = {
             "title": title,
             "description": description,
             "is_published": is_published,
             "created_at": firestore.SERVER_TIMESTAMP
-        })
+        }
+        if image_file:
+            news_data.update(pending_image_fields())
+        news_ref.set(news_data)
         
+        news_cache.clear()
+
+        if image_file:
+            enqueue_image_upload(news_ref, image_file, 'community_news', news_data["image_upload_id"],
+                                 on_complete=news_cache.clear)
+
         return jsonify({
             'msg': 'Successfully created news item',
-            'id': news_ref.id
+            'id': news_ref.id,
+            'image_status': news_data.get('image_status')
         }), 201
         
     except Exception as e:
-        print(f"Create news error: {str(e)}")
+        current_app.logger.exception("Create news error")
         return jsonify({
             'msg': 'Internal server error',
             'error': str(e)
@@ -105,20 +150,32 @@ def update_news(news_id):
         is_published_raw = request.form.get('is_published', 'true')
         is_published = is_published_raw.lower() in ('true', '1', 'yes')
 
+        image_file = request.files.get('image')
+        if image_file and (not image_file.filename or not allowed_file(image_file.filename)):
+            image_file = None
+
         if not title:
             return jsonify({'msg': 'Title cannot be empty'}), 400
 
         # Update document
-        news_doc_ref.update({
+        update_data = {
             "title": title,
             "description": description,
             "is_published": is_published
-        })
+        }
+        if image_file:
+            update_data.update(pending_image_fields())
+        news_doc_ref.update(update_data)
+        news_cache.clear()
+
+        if image_file:
+            enqueue_image_upload(news_doc_ref, image_file, 'community_news', update_data["image_upload_id"],
+                                 on_complete=news_cache.clear)
 
         return jsonify({'msg': 'News updated successfully'}), 200
 
     except Exception as e:
-        print(f"Update news error: {str(e)}")
+        current_app.logger.exception("Update news error")
         return jsonify({
             'msg': 'Internal server error',
             'error': str(e)
@@ -140,11 +197,12 @@ def delete_news(news_id):
             return jsonify({'msg': 'News item not found'}), 404
 
         news_doc_ref.delete()
+        news_cache.clear()
         return jsonify({'msg': 'News deleted successfully'}), 200
 
     except Exception as e:
-        print(f"Delete news error: {str(e)}")
+        current_app.logger.exception("Delete news error")
         return jsonify({
             'msg': 'Internal server error',
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
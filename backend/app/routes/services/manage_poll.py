@@ -0,0 +1,266 @@
+from flask import Blueprint, jsonify, request, current_app
+from firebase_admin import firestore
+from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.sharded_counter import increment_shard, get_counts
+from app.routes.utils.cache import TTLCache
+from app.config import Config
+
+polls_bp = Blueprint('polls', __name__)
+
+'''
+Each option is a sharded counter at polls/{pid}/options/{option_id}, and
+every voter gets an idempotency record at polls/{pid}/voters/{uid}. A
+vote writes both in one transaction, so a burst of votes during a
+meeting spreads over VOTE_SHARDS docs per option instead of one.
+'''
+
+VOTE_SHARDS = 10
+MAX_OPTIONS = 10
+
+# Aggregated counts per poll; each worker also applies its own votes to them
+results_cache = TTLCache(ttl=Config.POLL_RESULTS_TTL, max_entries=256)
+
+
+def option_refs(poll_ref, options):
+    return [poll_ref.collection('options').document(option['id']) for option in options]
+
+
+def get_results(db, poll_ref, poll_data):
+    """Return {option_id: votes}, from the final tally, the cache or the shards."""
+    if poll_data.get('final_counts') is not None:
+        return poll_data['final_counts']
+
+    counts = results_cache.get(poll_ref.id)
+    if counts is None:
+        counts = get_counts(db, option_refs(poll_ref, poll_data.get('options', [])), VOTE_SHARDS)
+        results_cache.set(poll_ref.id, counts)
+    return dict(counts)
+
+
+def serialize_poll(poll_id, poll_data, counts, user_vote=None):
+    return {
+        'id': poll_id,
+        'question': poll_data.get('question', ''),
+        'status': poll_data.get('status', 'Active'),
+        'options': [
+            {**option, 'votes': counts.get(option['id'], 0)}
+            for option in poll_data.get('options', [])
+        ],
+        'total_votes': sum(counts.values()),
+        'created_by': poll_data.get('created_by'),
+        'created_at': poll_data.get('created_at'),
+        'closed_at': poll_data.get('closed_at'),
+        'user_vote': user_vote
+    }
+
+
+@firestore.transactional
+def _cast_vote(transaction, poll_ref, voter_ref, option_id, user):
+    """
+    Returns (status, previous_option). Reading the poll inside the
+    transaction takes a shared lock, so votes do not block each other
+    but cannot land after a concurrent close.
+    """
+    poll_doc = poll_ref.get(transaction=transaction)
+    if not poll_doc.exists:
+        return 'not_found', None
+    poll_data = poll_doc.to_dict()
+    if poll_data.get('status') != 'Active':
+        return 'closed', None
+    if option_id not in {option['id'] for option in poll_data.get('options', [])}:
+        return 'invalid_option', None
+
+    voter_doc = voter_ref.get(transaction=transaction)
+    if voter_doc.exists:
+        return 'already_voted', voter_doc.to_dict().get('option_id')
+
+    transaction.set(voter_ref, {
+        'option_id': option_id,
+        'email': user.get('email'),
+        'created_at': firestore.SERVER_TIMESTAMP
+    })
+    increment_shard(transaction, poll_ref.collection('options').document(option_id), 1, VOTE_SHARDS)
+    return 'voted', None
+
+
+@polls_bp.route('/polls', methods=['GET'])
+def get_polls():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'msg': 'Unauthorized'}), 401
+
+        status = request.args.get('status', 'Active')
+        if status not in ('Active', 'Closed'):
+            return jsonify({'msg': 'status must be Active or Closed'}), 400
+
+        db = current_app.config['db']
+        polls_ref = db.collection('polls')
+        # Needs the (status, created_at) composite index in firestore.indexes.json
+        query = polls_ref.where('status', '==', status).order_by('created_at', direction=firestore.Query.DESCENDING)
+        docs = list(query.stream())
+
+        # One batched read for the current user's votes on every listed poll
+        voter_refs = [doc.reference.collection('voters').document(user['uid']) for doc in docs]
+        user_votes = {
+            snap.reference.parent.parent.id: snap.to_dict().get('option_id')
+            for snap in (db.get_all(voter_refs) if voter_refs else []) if snap.exists
+        }
+
+        polls = []
+        for doc in docs:
+            poll_data = doc.to_dict()
+            counts = get_results(db, doc.reference, poll_data)
+            polls.append(serialize_poll(doc.id, poll_data, counts, user_votes.get(doc.id)))
+
+        return jsonify({'msg': 'Successfully fetched polls', 'polls': polls}), 200
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
+
+
+@polls_bp.route('/polls/<pid>', methods=['GET'])
+def get_poll(pid):
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'msg': 'Unauthorized'}), 401
+
+        db = current_app.config['db']
+        poll_ref = db.collection('polls').document(pid)
+        voter_ref = poll_ref.collection('voters').document(user['uid'])
+        poll_doc, voter_doc = None, None
+        for snap in db.get_all([poll_ref, voter_ref]):
+            if snap.reference.path == poll_ref.path:
+                poll_doc = snap
+            else:
+                voter_doc = snap
+
+        if poll_doc is None or not poll_doc.exists:
+            return jsonify({'msg': 'Poll not found'}), 404
+
+        poll_data = poll_doc.to_dict()
+        user_vote = voter_doc.to_dict().get('option_id') if voter_doc and voter_doc.exists else None
+        counts = get_results(db, poll_ref, poll_data)
+
+        return jsonify({
+            'msg': 'Successfully fetched poll',
+            'poll': serialize_poll(pid, poll_data, counts, user_vote)
+        }), 200
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
+
+
+@polls_bp.route('/create-poll', methods=['POST'])
+def create_poll():
+    try:
+        user = get_current_user()
+        if not user or not user.get('is_admin', False):
+            return jsonify({'msg': 'Unauthorized'}), 401
+
+        data = request.get_json()
+        if not data:
+            return jsonify({'msg': 'Missing JSON data'}), 400
+
+        question = (data.get('question') or '').strip()
+        options = data.get('options')
+        if not question:
+            return jsonify({'msg': 'Question is required'}), 400
+        if not isinstance(options, list) or not 2 <= len(options) <= MAX_OPTIONS:
+            return jsonify({'msg': f'Provide between 2 and {MAX_OPTIONS} options'}), 400
+
+        option_texts = [str(option).strip() for option in options]
+        if any(not text for text in option_texts):
+            return jsonify({'msg': 'Options cannot be empty'}), 400
+
+        db = current_app.config['db']
+        poll_ref = db.collection('polls').document()
+        poll_ref.set({
+            'question': question,
+            'options': [{'id': str(i), 'text': text} for i, text in enumerate(option_texts)],
+            'status': 'Active',
+            'created_by': user.get('email'),
+            'created_at': firestore.SERVER_TIMESTAMP,
+            'closed_at': None,
+            'final_counts': None
+        })
+
+        return jsonify({'msg': 'Poll created successfully', 'id': poll_ref.id}), 201
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
+
+
+@polls_bp.route('/polls/<pid>/vote', methods=['POST'])
+def vote(pid):
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'msg': 'Unauthorized'}), 401
+
+        data = request.get_json()
+        if not data or 'option_id' not in data:
+            return jsonify({'msg': 'Missing option_id'}), 400
+        option_id = str(data['option_id'])
+
+        db = current_app.config['db']
+        poll_ref = db.collection('polls').document(pid)
+        voter_ref = poll_ref.collection('voters').document(user['uid'])
+
+        status, previous_option = _cast_vote(db.transaction(), poll_ref, voter_ref, option_id, user)
+        if status == 'not_found':
+            return jsonify({'msg': 'Poll not found'}), 404
+        if status == 'closed':
+            return jsonify({'msg': 'Poll is closed'}), 400
+        if status == 'invalid_option':
+            return jsonify({'msg': 'Invalid option'}), 400
+        if status == 'already_voted':
+            # Retrying the same vote is not an error
+            if previous_option == option_id:
+                return jsonify({'msg': 'Vote already recorded', 'option_id': option_id}), 200
+            return jsonify({'msg': 'You have already voted in this poll', 'option_id': previous_option}), 409
+
+        # Apply the vote to this worker's cached tally so the voter sees it straight away
+        counts = results_cache.get(pid)
+        if counts is not None:
+            counts = dict(counts)
+            counts[option_id] = counts.get(option_id, 0) + 1
+            results_cache.set(pid, counts)
+
+        return jsonify({'msg': 'Vote recorded', 'option_id': option_id}), 201
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
+
+
+@polls_bp.route('/polls/<pid>/close', methods=['PUT'])
+def close_poll(pid):
+    try:
+        user = get_current_user()
+        if not user or not user.get('is_admin', False):
+            return jsonify({'msg': 'Unauthorized'}), 401
+
+        db = current_app.config['db']
+        poll_ref = db.collection('polls').document(pid)
+        poll_doc = poll_ref.get()
+        if not poll_doc.exists:
+            return jsonify({'msg': 'Poll not found'}), 404
+
+        poll_data = poll_doc.to_dict()
+        if poll_data.get('status') == 'Closed':
+            return jsonify({'msg': 'Poll is already closed'}), 400
+
+        # Flip the status first so no vote can land between the tally and the close
+        poll_ref.update({'status': 'Closed', 'closed_at': firestore.SERVER_TIMESTAMP})
+        counts = get_counts(db, option_refs(poll_ref, poll_data.get('options', [])), VOTE_SHARDS)
+        poll_ref.update({'final_counts': counts})
+        results_cache.delete(pid)
+
+        return jsonify({
+            'msg': 'Poll closed successfully',
+            'poll': serialize_poll(pid, poll_data | {'status': 'Closed'}, counts)
+        }), 200
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal Server Error', 'error': str(e)}), 500
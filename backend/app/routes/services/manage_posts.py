@@ -1,9 +1,19 @@
 from flask import Blueprint, jsonify, request, current_app
 from firebase_admin import firestore
 from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.pagination import parse_page_args, paginate_query
+from app.routes.utils.comments_migration import make_excerpt, migrate_comments_page, migrate_post_comments
+from app.routes.utils.sharded_counter import increment_shard
+from app.routes.utils.like_rollup import LIKE_SHARDS, LIKE_SHARDS_COLLECTION, mark_dirty
 
 posts_bp = Blueprint("posts", __name__)
 
+MAX_LIKED_CHECK = 100
+# `likes` is the fallback for posts without a rolled-up `like_count`
+FEED_FIELDS = ["title", "excerpt", "author", "likes", "like_count", "comment_count", "created_at"]
+# Only posts that /migrate-comments has not reached yet lack an excerpt
+LEGACY_FEED_FIELDS = ["content", "comments", "liked_by"]
+
 
 def get_db():
     """
@@ -13,6 +23,58 @@ def get_db():
     return current_app.config["db"]
 
 
+def get_liked_flags(db, post_ids, user, legacy_liked_by=None):
+    """
+    Report whether `user` liked each post, using one batched read of the
+    like markers plus the legacy `liked_by` arrays. Callers that already
+    hold the arrays pass them as `legacy_liked_by` to skip the post reads.
+    """
+    posts_ref = db.collection("posts")
+    refs = []
+    for post_id in post_ids:
+        post_ref = posts_ref.document(post_id)
+        if legacy_liked_by is None:
+            refs.append(post_ref)
+        refs.append(post_ref.collection("likes").document(user["uid"]))
+
+    liked = {
+        post_id: user.get("email") in (legacy_liked_by or {}).get(post_id, [])
+        for post_id in post_ids
+    }
+    for snapshot in db.get_all(refs, field_paths=["liked_by"]):
+        if not snapshot.exists:
+            continue
+        if snapshot.reference.parent.id == "likes":
+            liked[snapshot.reference.parent.parent.id] = True
+        elif user.get("email") in (snapshot.to_dict() or {}).get("liked_by", []):
+            liked[snapshot.id] = True
+    return liked
+
+
+@firestore.transactional
+def _add_like(transaction, post_ref, like_ref, user):
+    if like_ref.get(transaction=transaction).exists:
+        return False
+
+    transaction.set(like_ref, {
+        "uid": user.get("uid"),
+        "email": user.get("email"),
+        "created_at": firestore.SERVER_TIMESTAMP
+    })
+    increment_shard(transaction, post_ref, 1, LIKE_SHARDS, LIKE_SHARDS_COLLECTION)
+    return True
+
+
+@firestore.transactional
+def _remove_like(transaction, post_ref, like_ref):
+    if not like_ref.get(transaction=transaction).exists:
+        return False
+
+    transaction.delete(like_ref)
+    increment_shard(transaction, post_ref, -1, LIKE_SHARDS, LIKE_SHARDS_COLLECTION)
+    return True
+
+
 @posts_bp.route("/posts", methods=["GET"])
 def get_all_posts():
     """
@@ -38,6 +100,13 @@ def get_all_posts():
         for doc in posts_ref.stream():
             post = doc.to_dict()
             post["id"] = doc.id
+            # Comments live in a subcollection; legacy posts still carry the array
+            legacy_comments = post.pop("comments", None)
+            if "comment_count" not in post:
+                post["comment_count"] = len(legacy_comments or [])
+            post.pop("liked_by", None)
+            # Posts never liked since sharding have no rolled-up count, their `likes` is still exact
+            post["likes"] = post.pop("like_count", post.get("likes", 0))
             posts.append(post)
 
         return jsonify({"posts": posts}), 200
@@ -45,15 +114,95 @@ def get_all_posts():
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
     
+@posts_bp.route("/feed", methods=["GET"])
+def get_feed():
+    """
+    Retrieve a page of post summaries, newest first.
+
+    Each item carries an excerpt instead of the full content, the like and
+    comment counts, and whether the current user has liked it, so the
+    payload does not grow with engagement.
+
+    Authentication:
+        - Requires a valid authenticated user.
+
+    Query params:
+        - limit: page size (default 20, max 50)
+        - start_after: `next_page_token` from the previous page
+
+    Returns:
+        - 200: Page of post summaries and the next page token
+        - 400: Invalid pagination parameters
+        - 401: Unauthorized
+        - 500: Internal server error
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        try:
+            limit, start_after = parse_page_args()
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        db = get_db()
+        posts_ref = db.collection("posts")
+        query = posts_ref.order_by("created_at", direction=firestore.Query.DESCENDING).select(FEED_FIELDS)
+        try:
+            docs, next_page_token = paginate_query(query, posts_ref, limit, start_after)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        post_ids = [doc.id for doc in docs]
+        rows = {doc.id: doc.to_dict() for doc in docs}
+
+        # Unmigrated posts still keep their text, comments and likes inline
+        legacy_liked_by = {}
+        legacy_refs = [doc.reference for doc in docs if "excerpt" not in rows[doc.id]]
+        if legacy_refs:
+            for snapshot in db.get_all(legacy_refs, field_paths=LEGACY_FEED_FIELDS):
+                legacy = snapshot.to_dict() or {}
+                rows[snapshot.id]["excerpt"] = make_excerpt(legacy.get("content"))
+                rows[snapshot.id].setdefault("comment_count", len(legacy.get("comments") or []))
+                legacy_liked_by[snapshot.id] = legacy.get("liked_by", [])
+        liked = get_liked_flags(db, post_ids, user, legacy_liked_by) if post_ids else {}
+
+        posts = []
+        for post_id in post_ids:
+            data = rows[post_id]
+            posts.append({
+                "id": post_id,
+                "title": data.get("title", ""),
+                "excerpt": data.get("excerpt", ""),
+                "author": data.get("author", "Unknown"),
+                "likes": data.get("like_count", data.get("likes", 0)),
+                "comment_count": data.get("comment_count", 0),
+                "created_at": data.get("created_at"),
+                "liked": liked.get(post_id, False)
+            })
+
+        return jsonify({"posts": posts, "next_page_token": next_page_token}), 200
+
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
 @posts_bp.route("/comments/<post_id>", methods=["GET"])
 def get_post_comments(post_id):
     """
-    Retrieve comments for a specific post.
+    Retrieve comments for a specific post, oldest first.
 
     Authentication:
         - Requires a valid authenticated user.
+
+    Query params:
+        - limit: page size (default 20, max 50)
+        - start_after: `next_page_token` from the previous page
+
     Returns:
-        - 200: List of comments
+        - 200: Page of comments and the next page token
+        - 400: Invalid pagination parameters
         - 401: Unauthorized
         - 404: Post not found
         - 500: Internal server error
@@ -63,6 +212,11 @@ def get_post_comments(post_id):
         if not user:
             return jsonify({"error": "Unauthorized"}), 401
 
+        try:
+            limit, start_after = parse_page_args()
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
         db = get_db()
         post_ref = db.collection("posts").document(post_id)
         post_doc = post_ref.get()
@@ -70,10 +224,21 @@ def get_post_comments(post_id):
         if not post_doc.exists:
             return jsonify({"error": "Post not found"}), 404
 
-        post_data = post_doc.to_dict()
-        comments = post_data.get("comments", [])
+        # Posts that have not been migrated yet still keep comments inline
+        legacy_comments = post_doc.to_dict().get("comments")
+        if legacy_comments is not None:
+            return jsonify({"comments": legacy_comments, "next_page_token": None}), 200
 
-        return jsonify({"comments": comments}), 200
+        comments_ref = post_ref.collection("comments")
+        query = comments_ref.order_by("created_at", direction=firestore.Query.ASCENDING)
+        try:
+            docs, next_page_token = paginate_query(query, comments_ref, limit, start_after)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        comments = [doc.to_dict() | {"id": doc.id} for doc in docs]
+
+        return jsonify({"comments": comments, "next_page_token": next_page_token}), 200
 
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
@@ -121,9 +286,10 @@ def create_post():
         post_ref.set({
             "title": title,
             "content": content,
-            "comments": [],
+            "excerpt": make_excerpt(content),
+            "comment_count": 0,
             "likes": 0,
-            "liked_by": [],
+            "like_count": 0,
             "author": author,
             "created_at": firestore.SERVER_TIMESTAMP
         })
@@ -137,13 +303,19 @@ def create_post():
 @posts_bp.route("/posts/<post_id>/like", methods=["POST"])
 def like_post(post_id):
     """
-    Increment the like count of a post.
+    Like a post.
+
+    The like is recorded as a marker doc at posts/{id}/likes/{uid} and the
+    count as a random shard increment, in one transaction, so concurrent
+    likes never contend on the post document. A background job rolls the
+    shards up into the post's `like_count` for the listings to read.
 
     Authentication:
         - Requires an authenticated user.
 
     Returns:
         - 200: Like registered
+        - 400: Already liked
         - 401: Unauthorized
         - 404: Post not found
         - 500: Internal server error
@@ -155,17 +327,20 @@ def like_post(post_id):
 
         db = get_db()
         post_ref = db.collection("posts").document(post_id)
+        post_doc = post_ref.get(field_paths=["liked_by"])
 
-        if not post_ref.get().exists:
+        if not post_doc.exists:
             return jsonify({"error": "Post not found"}), 404
-        
-        if user.get("email") in post_ref.get().to_dict().get("liked_by", []):
+
+        # Likes given before sharding are still tracked by email on the post
+        if user.get("email") in (post_doc.to_dict() or {}).get("liked_by", []):
             return jsonify({"error": "You have already liked this post"}), 400
 
-        post_ref.update({
-            "likes": firestore.Increment(1),
-            "liked_by": firestore.ArrayUnion([user.get("email")])
-        })
+        like_ref = post_ref.collection("likes").document(user["uid"])
+        if not _add_like(db.transaction(), post_ref, like_ref, user):
+            return jsonify({"error": "You have already liked this post"}), 400
+
+        mark_dirty(post_id)
 
         return jsonify({"msg": "Post liked successfully"}), 200
 
@@ -173,6 +348,86 @@ def like_post(post_id):
         return jsonify({"error": str(exc)}), 500
 
 
+@posts_bp.route("/posts/<post_id>/like", methods=["DELETE"])
+def unlike_post(post_id):
+    """
+    Remove the current user's like from a post.
+
+    Authentication:
+        - Requires an authenticated user.
+
+    Returns:
+        - 200: Like removed
+        - 400: Post was not liked
+        - 401: Unauthorized
+        - 404: Post not found
+        - 500: Internal server error
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        db = get_db()
+        post_ref = db.collection("posts").document(post_id)
+        like_ref = post_ref.collection("likes").document(user["uid"])
+
+        if _remove_like(db.transaction(), post_ref, like_ref):
+            mark_dirty(post_id)
+            return jsonify({"msg": "Like removed successfully"}), 200
+
+        post_doc = post_ref.get(field_paths=["liked_by"])
+        if not post_doc.exists:
+            return jsonify({"error": "Post not found"}), 404
+
+        if user.get("email") in (post_doc.to_dict() or {}).get("liked_by", []):
+            post_ref.update({
+                "likes": firestore.Increment(-1),
+                "liked_by": firestore.ArrayRemove([user.get("email")])
+            })
+            mark_dirty(post_id)
+            return jsonify({"msg": "Like removed successfully"}), 200
+
+        return jsonify({"error": "You have not liked this post"}), 400
+
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+@posts_bp.route("/posts/liked", methods=["GET"])
+def get_liked_posts():
+    """
+    Check which of the given posts the current user has liked.
+
+    Authentication:
+        - Requires an authenticated user.
+
+    Query params:
+        - ids: comma separated post ids (max 100)
+
+    Returns:
+        - 200: Map of post id to liked flag
+        - 400: Missing or too many ids
+        - 401: Unauthorized
+        - 500: Internal server error
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        post_ids = [pid for pid in request.args.get("ids", "").split(",") if pid]
+        if not post_ids:
+            return jsonify({"error": "ids parameter is required"}), 400
+        if len(post_ids) > MAX_LIKED_CHECK:
+            return jsonify({"error": f"At most {MAX_LIKED_CHECK} ids can be checked at once"}), 400
+
+        return jsonify({"liked": get_liked_flags(get_db(), post_ids, user)}), 200
+
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
 @posts_bp.route("/posts/<post_id>/comment", methods=["POST"])
 def comment_on_post(post_id):
     """
@@ -204,20 +459,79 @@ def comment_on_post(post_id):
 
         db = get_db()
         post_ref = db.collection("posts").document(post_id)
+        post_doc = post_ref.get()
 
-        if not post_ref.get().exists:
+        if not post_doc.exists:
             return jsonify({"error": "Post not found"}), 404
 
+        # Move inline comments out first so the new one is not hidden behind them
+        if "comments" in post_doc.to_dict():
+            migrate_post_comments(db, post_doc)
+
+        comment_ref = post_ref.collection("comments").document()
         comment = {
             "user": user.get("name", "Anonymous"),
+            "uid": user.get("uid"),
             "text": data["comment"],
+            "created_at": firestore.SERVER_TIMESTAMP
         }
 
-        post_ref.update({
-            "comments": firestore.ArrayUnion([comment])
-        })
+        # Comment and counter are written together so the count never drifts
+        batch = db.batch()
+        batch.set(comment_ref, comment)
+        batch.update(post_ref, {"comment_count": firestore.Increment(1)})
+        batch.commit()
+
+        return jsonify({"msg": "Comment added successfully", "id": comment_ref.id}), 201
+
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+
+@posts_bp.route("/migrate-comments", methods=["POST"])
+def migrate_comments():
+    """
+    Move inline comment arrays into the comments subcollection and
+    `liked_by` emails into like markers, and store the feed excerpt, one
+    page of posts per call. Safe to run while the app is serving traffic and
+    safe to re-run; call again with `next_page_token` until it is null.
+
+    Authentication:
+        - Requires an authenticated admin user.
+
+    Payload (optional):
+        {
+            "limit": int,
+            "start_after": "post id"
+        }
+
+    Returns:
+        - 200: Migration progress and the next page token
+        - 400: Invalid payload
+        - 401: Unauthorized
+        - 500: Internal server error
+    """
+    try:
+        user = get_current_user()
+        if not user or not user.get("is_admin", False):
+            return jsonify({"error": "Unauthorized"}), 401
 
-        return jsonify({"msg": "Comment added successfully"}), 201
+        data = request.get_json(silent=True) or {}
+        try:
+            limit = max(1, min(int(data.get("limit", 50)), 200))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid limit"}), 400
+
+        migrated_posts, migrated_comments, next_page_token = migrate_comments_page(
+            get_db(), limit, data.get("start_after")
+        )
+
+        return jsonify({
+            "msg": "Comments migrated",
+            "migrated_posts": migrated_posts,
+            "migrated_comments": migrated_comments,
+            "next_page_token": next_page_token
+        }), 200
 
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
@@ -1,7 +1,9 @@
+import asyncio
 from flask import Blueprint, jsonify, request, current_app
 from firebase_admin import firestore
-from app.routes.utils.user_verifier_func import get_current_user
-from app.routes.utils.notification_sender import send_notification
+from app.routes.utils.user_verifier_func import get_current_user, get_current_user_async
+from app.routes.utils.notification_sender import send_notification, send_notification_async
+from app.datastore.aio import get_async_db
 from app.routes.utils.points_updater import update_points
 import datetime
 import re
@@ -59,7 +61,7 @@ def get_approved_projects():
         }), 200
 
     except Exception as e:
-        print(f"Error in get_approved_projects: {str(e)}")  
+        current_app.logger.exception("Error in get_approved_projects")
         return jsonify({
             'msg': 'Internal server error',
             'error': str(e)
@@ -158,7 +160,7 @@ def create_project():
         return jsonify({'msg': 'Successfully created the project'}), 201
 
     except Exception as e:
-        print(f"Create project error: {str(e)}")  
+        current_app.logger.exception("Create project error")
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
 
 @projects_bp.route('/edit-project/<id>', methods=['PUT'])
@@ -213,48 +215,51 @@ def delete_project(id):
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
 
 @projects_bp.route('/approve-project/<id>', methods=['PUT', 'PATCH'])
-def approve_project(id):
+async def approve_project(id):
     try:
-        db = current_app.config['db']
-        user = get_current_user()
+        db = get_async_db()
+        user = await get_current_user_async()
         if not user or not user.get('is_admin'):
             return jsonify({'msg': 'Unauthorized User'}), 401
+        project_ref = db.collection('projects').document(id)
+        doc = await project_ref.get()
         
         data = request.get_json()
         if not data or "points" not in data:
             return jsonify({'msg': 'Missing points'}), 400
 
-        project_ref = db.collection('projects').document(id)
-        doc = project_ref.get()
         if not doc.exists:
             return jsonify({'msg': 'Project not found'}), 404
 
         points = data["points"]
-        project_ref.update({"is_approved": True, "points": points})
 
-        send_notification(
-            db=db,
-            title="Project Approved",
-            message=f"Your project '{doc.to_dict().get('title','')}' has been approved with {points} points.",
-            notification_type="info",                    
-            to_email=doc.to_dict().get('author_email',''),      
-            project_id=id,                               
-            from_email="admin@yourclub.edu"              
-        )
         author_uid = doc.to_dict().get('author_uid', None)
         if not author_uid:
             email = doc.to_dict().get('author_email')
-            users_ref = db.collection('Users').where('email', '==', email)
-            for u in users_ref.stream():
+            for u in await db.collection('Users').where('email', '==', email).get():
                 author_uid = u.id
 
+        # Approval and contribution land together or not at all
+        batch = db.batch()
+        batch.update(project_ref, {"is_approved": True, "points": points})
         if author_uid:
-            db.collection('contributions').add({
+            batch.set(db.collection('contributions').document(), {
                 "uid": author_uid,
                 "name": doc.to_dict().get("author", ""),
                 "title" : f"Intialzed Project {doc.to_dict().get("title", "")}",
                 "timestamp": firestore.SERVER_TIMESTAMP
             })
+        await batch.commit()
+
+        await send_notification_async(
+            db=db,
+            title="Project Approved",
+            message=f"Your project '{doc.to_dict().get('title','')}' has been approved with {points} points.",
+            notification_type="info",                    
+            to_email=doc.to_dict().get('author_email',''),      
+            project_id=id,                               
+            from_email="admin@yourclub.edu"              
+        )
 
         return jsonify({'msg': 'Successfully approved the project'}), 200
     except Exception as e:
@@ -334,32 +339,48 @@ def join_project(pid):
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
 
 @projects_bp.route('/approve_user/<pid>/<uid>/<nid>', methods=['PUT'])
-def approve_user(pid, uid, nid):
+async def approve_user(pid, uid, nid):
     try:
-        db = current_app.config['db']
-        current_user = get_current_user()
+        db = get_async_db()
+        # Anonymous requests are turned away before anything is read
+        current_user = await get_current_user_async()
+        if not current_user:
+            return jsonify({'msg': 'Unauthorized User'}), 401
         project_ref = db.collection('projects').document(pid)
-        project_doc = project_ref.get()
+        user_ref = db.collection('Users').document(uid)
+        project_doc, user_doc = await asyncio.gather(project_ref.get(), user_ref.get())
         if not project_doc.exists:
             return jsonify({'msg': "Project does not exist"}), 404
         notification_ref = db.collection('notifications').document(nid)
         project_data = project_doc.to_dict()
-        if not current_user or (not current_user.get('is_admin', False) and current_user['email'] != project_data['author_email']):
+        if not current_user.get('is_admin', False) and current_user['email'] != project_data['author_email']:
             return jsonify({'msg': 'Unauthorized User'}), 401
 
-        user_ref = db.collection('Users').document(uid)
-        user_doc = user_ref.get()
         if not user_doc.exists:
             return jsonify({'msg': "User does not exist"}), 404
         user_data = user_doc.to_dict()
 
-        project_ref.update({
+        # One commit, so a failure leaves the join request in place to approve again
+        batch = db.batch()
+        batch.update(project_ref, {
             "unknown_members": firestore.ArrayRemove([uid]),
-            "members": firestore.ArrayUnion([user_data['name']])
+            "members": firestore.ArrayUnion([user_data['name']]),
+            # Names are not unique; the uid lets a member's entry be told apart from a namesake's
+            "member_uids": firestore.ArrayUnion([uid])
         })
+        batch.delete(notification_ref)
+        batch.set(db.collection('contributions').document(), {
+            "uid": uid,
+            "name": user_data.get("name", ""),
+            "project_id": pid,
+            "project_title": project_data.get("title", ""),
+            "points": project_data.get("points", 0),
+            "type": "project_join",
+            "timestamp": firestore.SERVER_TIMESTAMP
+        })
+        await batch.commit()
 
-        notification_ref.delete()
-        send_notification(
+        await send_notification_async(
             db,
             "Project Membership Approved",
             f"You have been approved to join the project '{project_data['title']}'.",
@@ -369,17 +390,6 @@ def approve_user(pid, uid, nid):
             current_user.get('email', 'admin@email.com')
         )
 
-        db.collection('contributions').add({
-            "uid": uid,
-            "name": user_data.get("name", ""),
-            "project_id": pid,
-            "project_title": project_data.get("title", ""),
-            "points": project_data.get("points", 0),
-            "type": "project_join",
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
-        # ----------------------------------------------------
-
         return jsonify({'msg': 'Successfully approved the user for the project'}), 200
     except Exception as e:
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
@@ -437,10 +447,9 @@ def get_user_projects():
         projects = []
         for doc in docs:
             projects.append({"id": doc.id, **doc.to_dict()})
-        print(projects)
         return jsonify({'projects': projects}), 200
     except Exception as e:
-        print(e)
+        current_app.logger.exception("Error in get_user_projects")
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
 
 @projects_bp.route('/projects/request-completion/<pid>', methods=['POST'])
@@ -487,18 +496,17 @@ def request_completion(pid):
 
 
 @projects_bp.route('/projects/<pid>/approve-completion/<nid>', methods=['PUT'])
-def approve_completion(pid, nid):
+async def approve_completion(pid, nid):
     try:
-        db = current_app.config['db']
-        user = get_current_user()
+        db = get_async_db()
+        user = await get_current_user_async()
         if not user or not user.get('is_admin', False):
             return jsonify({'msg': 'Unauthorized User'}), 401
+        project_ref = db.collection('projects').document(pid)
+        doc = await project_ref.get()
         uid = user.get('uid')
         user_ref = db.collection('Users').document(uid)
-        user_doc = user_ref.get().to_dict()
-        project_ref = db.collection('projects').document(pid)
         notification_ref = db.collection('notifications').document(nid)
-        doc = project_ref.get()
         if not doc.exists:
             return jsonify({'msg': 'Project not found'}), 404
 
@@ -506,17 +514,23 @@ def approve_completion(pid, nid):
         if not project_data.get('completion_requested', False):
             return jsonify({'msg': 'No completion request found for this project'}), 400
 
-        project_ref.update({
+        points = project_data.get('points', 0)
+        members = project_data.get('members', [])
+        updated_points = update_points(points, members)
+        # One commit, so a failure leaves the completion request in place to approve again
+        batch = db.batch()
+        batch.update(project_ref, {
             "is_completed": True,
             "completion_requested": False,
             "completion_approval_date": datetime.datetime.now()
         })
+        batch.delete(notification_ref)
+        batch.update(user_ref, {
+            "points": updated_points
+        })
+        await batch.commit()
 
-        points = project_data.get('points', 0)
-        members = project_data.get('members', [])
-        updated_points = update_points(points, members)
-        notification_ref.delete()
-        send_notification(
+        await send_notification_async(
             db,
             "Project Completion Approved",
             f"Your project '{project_data['title']}' has been approved as completed.",
@@ -524,9 +538,6 @@ def approve_completion(pid, nid):
             project_data['author_email'],
             pid
         )
-        user_ref.update({
-            "points": updated_points
-        })
         return jsonify({'msg': 'Successfully approved project completion'}), 200
     except Exception as e:
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
@@ -1,8 +1,15 @@
-from flask import Blueprint, jsonify, request, current_app
+import json
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
 from app.routes.utils.user_verifier_func import get_current_user
 from app.routes.utils.user_rank_checker import user_rank_checker
 from firebase_admin import auth
 from firebase_admin.exceptions import FirebaseError
+from app.routes.utils.metrics import time_upstream
+from app.routes.utils.bulk_import import read_rows, run_import
+from app.routes.utils.export import EXPORTS, FORMATS, export_stream
+from app.routes.utils.member_index import FILTERS, MATCH_MODES, get_member_index, index_member, unindex_member
+from app.routes.utils.pagination import parse_page_args, paginate_rows
+from app.routes.utils.user_cleanup import enqueue_user_cleanup, retry_user_cleanup
 
 users_bp = Blueprint('users', __name__)
 
@@ -26,6 +33,69 @@ def get_all_users():
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
 
 
+@users_bp.route('/directory', methods=['GET'])
+def member_directory():
+    try:
+        user = get_current_user()
+        if not user or not user.get('is_admin', False):
+            return jsonify({'msg': 'Unauthorized User'}), 401
+
+        try:
+            limit, start_after = parse_page_args(default_limit=25, max_limit=100)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        match = request.args.get('match', 'prefix')
+        if match not in MATCH_MODES:
+            return jsonify({'msg': 'match must be prefix or substring'}), 400
+
+        filters = {field: request.args[field] for field in FILTERS if request.args.get(field)}
+        rows = get_member_index().search(request.args.get('q', ''), match, filters)
+
+        try:
+            page, next_page_token = paginate_rows(rows, limit, start_after)
+        except ValueError as e:
+            return jsonify({'msg': str(e)}), 400
+
+        return jsonify({
+            'msg': 'Successfully fetched members',
+            'members': [member | {'id': uid} for uid, member in page],
+            'total': len(rows),
+            'next_page_token': next_page_token
+        }), 200
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
+
+
+@users_bp.route('/export', methods=['GET'])
+def export_collection():
+    try:
+        user = get_current_user()
+        if not user or not user.get('is_admin', False):
+            return jsonify({'msg': 'Unauthorized User'}), 401
+
+        name = request.args.get('collection', 'users')
+        if name not in EXPORTS:
+            return jsonify({'msg': f"collection must be one of: {', '.join(EXPORTS)}"}), 400
+
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in FORMATS:
+            return jsonify({'msg': 'format must be csv or ndjson'}), 400
+
+        gzip = request.args.get('gzip', 'false').lower() in ('true', '1', 'yes')
+        filename = f"{name}.{fmt}" + ('.gz' if gzip else '')
+        mimetype = 'application/gzip' if gzip else ('text/csv' if fmt == 'csv' else 'application/x-ndjson')
+
+        body = export_stream(current_app.config['db'], name, fmt, gzip)
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
+
+
 @users_bp.route('/add-user', methods=['POST'])
 def add_user():
     try:
@@ -43,17 +113,19 @@ def add_user():
         if not user or not user.get('is_admin', False):
             return jsonify({'msg': 'Unauthorized User'}), 401
 
-        firebase_user = auth.create_user(
-            email=data.get('email'),
-            password=data.get('password'),
-            display_name=data.get('name')
-        )
+        with time_upstream('firebase_auth', 'create_user'):
+            firebase_user = auth.create_user(
+                email=data.get('email'),
+                password=data.get('password'),
+                display_name=data.get('name')
+            )
 
         uid = firebase_user.uid
-        auth.set_custom_user_claims(uid, {'is_admin': data.get('is_admin', False)})
+        with time_upstream('firebase_auth', 'set_custom_user_claims'):
+            auth.set_custom_user_claims(uid, {'is_admin': data.get('is_admin', False)})
 
         users_ref = db.collection('Users').document(uid)
-        users_ref.set({
+        profile = {
             'name': data.get('name'),
             'memo_tokens': data.get('memo_tokens', 0),
             'points': 0,
@@ -63,7 +135,9 @@ def add_user():
             'rank': 'Newbie',
             'email': data.get('email'),
             'workshops': []
-        })
+        }
+        users_ref.set(profile)
+        index_member(uid, profile)
 
         return jsonify({'msg': 'Successfully created user'}), 201
 
@@ -110,7 +184,8 @@ def edit_user(uid):
             update_args["display_name"] = data["name"]
 
         if update_args:
-            auth.update_user(uid, **update_args)
+            with time_upstream('firebase_auth', 'update_user'):
+                auth.update_user(uid, **update_args)
 
         # Update custom claims
         claims = {}
@@ -119,14 +194,17 @@ def edit_user(uid):
         if "role" in data:
             claims["role"] = data["role"]
         if claims:
-            auth.set_custom_user_claims(uid, claims)
+            with time_upstream('firebase_auth', 'set_custom_user_claims'):
+                auth.set_custom_user_claims(uid, claims)
 
         # Compute rank based on points
         current_points = updated_info.get('points', current_doc.to_dict().get('points', 0))
         updated_info['rank'] = user_rank_checker(current_points)
 
         users_ref.update(updated_info)
-        auth.revoke_refresh_tokens(uid)
+        index_member(uid, updated_info)
+        with time_upstream('firebase_auth', 'revoke_refresh_tokens'):
+            auth.revoke_refresh_tokens(uid)
 
         return jsonify({'msg': 'Successfully updated the user'}), 200
 
@@ -145,16 +223,99 @@ def delete_user(uid):
         if not user or not user.get("is_admin", False):
             return jsonify({'msg': 'Unauthorized User'}), 401
 
+        # Dependents refer to the member by email and name, so read them before deleting
+        users_ref = db.collection('Users').document(uid)
+        user_doc = users_ref.get(field_paths=['email', 'name'])
+        user_data = user_doc.to_dict() if user_doc.exists else {}
+
         # Delete from Firebase Auth first
-        auth.delete_user(uid)
+        with time_upstream('firebase_auth', 'delete_user'):
+            auth.delete_user(uid)
 
         # Delete from Firestore
-        users_ref = db.collection('Users').document(uid)
         users_ref.delete()
+        unindex_member(uid)
+
+        # Gallery, contributions, notifications and project entries are removed in the background
+        enqueue_user_cleanup(db, {'uid': uid, 'email': user_data.get('email'), 'name': user_data.get('name')})
 
-        return jsonify({'msg': 'Successfully deleted the user'}), 200
+        return jsonify({'msg': 'Successfully deleted the user', 'cleanup_status': 'queued'}), 200
 
     except FirebaseError as e:
         return jsonify({'msg': 'Firebase error', 'error': str(e)}), 500
     except Exception as e:
         return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
+
+
+
+@users_bp.route('/delete-user/<uid>/cleanup', methods=['GET'])
+def get_user_cleanup(uid):
+    try:
+        db = current_app.config['db']
+        user = get_current_user()
+        if not user or not user.get("is_admin", False):
+            return jsonify({'msg': 'Unauthorized User'}), 401
+
+        progress_doc = db.collection('user_deletions').document(uid).get()
+        if not progress_doc.exists:
+            return jsonify({'msg': 'No cleanup found for this user'}), 404
+
+        return jsonify({'msg': 'Successfully fetched cleanup status', 'cleanup': progress_doc.to_dict()}), 200
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
+
+
+@users_bp.route('/delete-user/<uid>/cleanup', methods=['POST'])
+def restart_user_cleanup(uid):
+    try:
+        db = current_app.config['db']
+        user = get_current_user()
+        if not user or not user.get("is_admin", False):
+            return jsonify({'msg': 'Unauthorized User'}), 401
+
+        # For cleanups cut short by a worker restart or marked failed
+        if not retry_user_cleanup(db, uid):
+            return jsonify({'msg': 'No cleanup found for this user'}), 404
+
+        return jsonify({'msg': 'Cleanup queued'}), 202
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
+
+
+@users_bp.route('/import-users', methods=['POST'])
+def bulk_import_users():
+    try:
+        user = get_current_user()
+        if not user or not user.get('is_admin', False):
+            return jsonify({'msg': 'Unauthorized User'}), 401
+
+        # Rows: email, name, committee, role and optionally is_admin, memo_tokens, password
+        fmt = request.args.get('format') or ('csv' if 'csv' in (request.content_type or '') else 'ndjson')
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({'msg': 'format must be csv or ndjson'}), 400
+
+        try:
+            start_row = max(0, int(request.args.get('start_row', 0)))
+        except ValueError:
+            return jsonify({'msg': 'Invalid start_row parameter'}), 400
+
+        source = request.files['file'].stream if 'file' in request.files else request.stream
+        db = current_app.config['db']
+
+        def generate():
+            last_row = start_row
+            try:
+                for result in run_import(db, read_rows(source, fmt), start_row):
+                    last_row = result.get('row', last_row)
+                    yield json.dumps(result) + '\n'
+            except Exception as e:
+                current_app.logger.exception("Bulk import failed")
+                # Every row up to last_row has a result; resume after it
+                yield json.dumps({'error': str(e), 'resume_from': last_row}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    except Exception as e:
+        return jsonify({'msg': 'Internal server error', 'error': str(e)}), 500
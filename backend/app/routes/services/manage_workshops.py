@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.routes.utils.user_verifier_func import get_current_user
+from app.routes.utils.collection_mirror import mirror_where
 from firebase_admin import firestore
 
 workshops_bp = Blueprint('workshops', __name__)
@@ -12,8 +13,12 @@ def get_workshops():
             return jsonify({'Msg': 'Unauthorized'}), 401
 
         db = current_app.config['db']
-        workshops_ref = db.collection('workshops').where('email', '==', user.get('email'))
-        workshops = [doc.to_dict() for doc in workshops_ref.stream()]
+        rows = mirror_where('workshops', 'email', user.get('email'))
+        if rows is not None:
+            workshops = [data for _, data in rows]
+        else:
+            workshops_ref = db.collection('workshops').where('email', '==', user.get('email'))
+            workshops = [doc.to_dict() for doc in workshops_ref.stream()]
 
         return jsonify({'msg': 'Successfully fetched workshops', 'workshops': workshops}), 200
     except Exception as e:
@@ -0,0 +1,228 @@
+import csv
+import hashlib
+import io
+import json
+import os
+from firebase_admin import auth
+from app.config import Config
+from app.routes.utils.metrics import time_upstream
+from app.routes.utils.member_index import index_member
+
+'''
+Bulk member import: rows in, one result per row out.
+
+Rows are read lazily from CSV or NDJSON and handled in chunks of
+AUTH_IMPORT_LIMIT. Each chunk costs one auth.get_users lookup per 100
+emails, one auth.import_users call, one Firestore get_all and one batch
+commit per 500 profiles, however many members it holds.
+
+Re-running an import is safe. Uids are derived from the email, and rows
+whose email already exists in Auth are skipped if they have a profile.
+A row only gets the missing profile if an earlier run died between the
+Auth import and the Firestore write. `start_row` skips rows a previous
+run already reported.
+'''
+
+AUTH_IMPORT_LIMIT = 1000
+AUTH_LOOKUP_LIMIT = 100
+FIRESTORE_BATCH_LIMIT = 500
+REQUIRED_FIELDS = ('email', 'name', 'committee', 'role')
+TRUE_VALUES = ('true', '1', 'yes')
+
+
+def read_rows(stream, fmt):
+    """Yield (row_number, dict) from a binary stream of CSV or NDJSON, numbered from 1."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else {'_invalid': 'Row is not a JSON object'}
+
+
+def member_uid(email):
+    return 'm_' + hashlib.sha256(email.encode('utf-8')).hexdigest()[:26]
+
+
+def normalize_row(row):
+    """Returns (member, error); member has clean, typed fields."""
+    if '_invalid' in row:
+        return None, row['_invalid']
+
+    member = {key: (str(row.get(key) or '').strip()) for key in REQUIRED_FIELDS}
+    missing = [key for key in REQUIRED_FIELDS if not member[key]]
+    if missing:
+        return None, f"Missing field: {', '.join(missing)}"
+
+    member['email'] = member['email'].lower()
+    if '@' not in member['email']:
+        return None, 'Invalid email'
+
+    try:
+        member['memo_tokens'] = int(row.get('memo_tokens') or 0)
+    except (TypeError, ValueError):
+        return None, 'memo_tokens must be a number'
+
+    is_admin = row.get('is_admin', False)
+    member['is_admin'] = is_admin if isinstance(is_admin, bool) else str(is_admin).strip().lower() in TRUE_VALUES
+    member['password'] = str(row.get('password') or '') or None
+    member['uid'] = member_uid(member['email'])
+    return member, None
+
+
+def hash_password(password):
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, Config.BULK_IMPORT_HASH_ROUNDS)
+    return digest, salt
+
+
+def profile_for(member):
+    """Same Users document add_user writes."""
+    return {
+        'name': member['name'],
+        'memo_tokens': member['memo_tokens'],
+        'points': 0,
+        'role': member['role'],
+        'committee': member['committee'],
+        'is_admin': member['is_admin'],
+        'rank': 'Newbie',
+        'email': member['email'],
+        'workshops': []
+    }
+
+
+def _existing_auth_users(emails):
+    """{email: uid} for the emails that already have an Auth account."""
+    existing = {}
+    for start in range(0, len(emails), AUTH_LOOKUP_LIMIT):
+        identifiers = [auth.EmailIdentifier(email) for email in emails[start:start + AUTH_LOOKUP_LIMIT]]
+        with time_upstream('firebase_auth', 'get_users'):
+            result = auth.get_users(identifiers)
+        for user in result.users:
+            existing[user.email.lower()] = user.uid
+    return existing
+
+
+def import_chunk(db, chunk):
+    """
+    Import one chunk of (row_number, member) pairs.
+    Returns a result dict per row, in input order.
+    """
+    if not chunk:
+        return []
+
+    users_ref = db.collection('Users')
+    results = {}
+
+    # A duplicate within the chunk would otherwise import twice
+    members = {}
+    for number, member in chunk:
+        if member['email'] in members:
+            results[number] = {'row': number, 'email': member['email'], 'status': 'error', 'error': 'Duplicate email in import'}
+        else:
+            members[member['email']] = (number, member)
+
+    existing = _existing_auth_users(list(members))
+    profile_refs = {email: users_ref.document(uid) for email, uid in existing.items()}
+    has_profile = {
+        snap.reference.id for snap in db.get_all(list(profile_refs.values()), field_paths=['email']) if snap.exists
+    } if profile_refs else set()
+
+    to_import, to_write = [], []
+    for email, (number, member) in members.items():
+        if email in existing:
+            member['uid'] = existing[email]
+            if member['uid'] in has_profile:
+                results[number] = {'row': number, 'email': email, 'uid': member['uid'], 'status': 'skipped', 'reason': 'Member already exists'}
+            else:
+                # Auth account from an interrupted run, only the profile is missing
+                to_write.append((number, member, 'resumed'))
+            continue
+        to_import.append((number, member))
+
+    if to_import:
+        records = []
+        with_passwords = any(member['password'] for _, member in to_import)
+        for _, member in to_import:
+            password_hash, password_salt = hash_password(member['password']) if member['password'] else (None, None)
+            records.append(auth.ImportUserRecord(
+                uid=member['uid'],
+                email=member['email'],
+                display_name=member['name'],
+                custom_claims={'is_admin': member['is_admin'], 'role': member['role']},
+                password_hash=password_hash,
+                password_salt=password_salt
+            ))
+
+        hash_alg = auth.UserImportHash.pbkdf2_sha256(rounds=Config.BULK_IMPORT_HASH_ROUNDS) if with_passwords else None
+        with time_upstream('firebase_auth', 'import_users'):
+            import_result = auth.import_users(records, hash_alg=hash_alg)
+
+        failed = {error.index: error.reason for error in import_result.errors}
+        for index, (number, member) in enumerate(to_import):
+            if index in failed:
+                results[number] = {'row': number, 'email': member['email'], 'status': 'error', 'error': failed[index]}
+            else:
+                to_write.append((number, member, 'created'))
+
+    for start in range(0, len(to_write), FIRESTORE_BATCH_LIMIT):
+        part = to_write[start:start + FIRESTORE_BATCH_LIMIT]
+        batch = db.batch()
+        for _, member, _ in part:
+            batch.set(users_ref.document(member['uid']), profile_for(member))
+        try:
+            batch.commit()
+            for number, member, status in part:
+                index_member(member['uid'], profile_for(member))
+                results[number] = {'row': number, 'email': member['email'], 'uid': member['uid'], 'status': status}
+        except Exception as e:
+            # Auth accounts exist; re-running the import writes these profiles
+            for number, member, _ in part:
+                results[number] = {'row': number, 'email': member['email'], 'uid': member['uid'], 'status': 'error', 'error': f'Profile not saved: {str(e)}'}
+
+    return [results[number] for number in sorted(results)]
+
+
+def run_import(db, rows, start_row=0):
+    """
+    Yield one result dict per input row in row order, then a summary
+    {'summary': {...}, 'last_row': n}. Rows up to `start_row` are skipped.
+    """
+    counts = {'created': 0, 'resumed': 0, 'skipped': 0, 'error': 0}
+    last_row = start_row
+    chunk, invalid = [], []
+
+    def flush():
+        # Invalid rows wait for their chunk so results stay in row order for resuming
+        for result in sorted(import_chunk(db, chunk) + invalid, key=lambda result: result['row']):
+            counts[result['status']] += 1
+            yield result
+        chunk.clear()
+        invalid.clear()
+
+    for number, row in rows:
+        if number <= start_row:
+            continue
+        last_row = number
+        member, error = normalize_row(row)
+        if error:
+            invalid.append({'row': number, 'email': row.get('email'), 'status': 'error', 'error': error})
+        else:
+            chunk.append((number, member))
+        if len(chunk) + len(invalid) == AUTH_IMPORT_LIMIT:
+            yield from flush()
+
+    if chunk or invalid:
+        yield from flush()
+
+    yield {'summary': counts, 'last_row': last_row}
@@ -0,0 +1,45 @@
+import threading
+from app.config import Config
+from app.routes.utils.metrics import time_upstream
+
+_configured = False
+_lock = threading.Lock()
+
+
+class _TimedUploader:
+    """Forwards to `cloudinary.uploader`, timing every call as an upstream request."""
+
+    def __init__(self, uploader):
+        self._uploader = uploader
+
+    def __getattr__(self, name):
+        attr = getattr(self._uploader, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            with time_upstream('cloudinary', name):
+                return attr(*args, **kwargs)
+        return timed
+
+
+def get_uploader():
+    """
+    Import and configure the Cloudinary SDK on first use, so importing a
+    blueprint or starting a worker does not pay for it.
+    """
+    global _configured
+    import cloudinary
+    import cloudinary.uploader
+
+    if not _configured:
+        with _lock:
+            if not _configured:
+                cloudinary.config(
+                    cloud_name=Config.CLOUDINARY_CLOUD_NAME,
+                    api_key=Config.CLOUDINARY_API_KEY,
+                    api_secret=Config.CLOUDINARY_API_SECRET,
+                    secure=True  # Always use HTTPS URLs
+                )
+                _configured = True
+    return _TimedUploader(cloudinary.uploader)
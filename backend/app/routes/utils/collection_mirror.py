@@ -0,0 +1,189 @@
+import logging
+import os
+import sys
+import threading
+import time
+from flask import current_app
+from app.config import Config
+from app.routes.utils.metrics import MIRROR_BYTES, MIRROR_DOCUMENTS, MIRROR_READY
+
+logger = logging.getLogger(__name__)
+
+'''
+In-memory mirrors of small, read-mostly collections.
+
+A mirror holds every document of one collection in the worker process
+and keeps it current through a Firestore `on_snapshot` listener, so
+GET handlers can filter in memory instead of querying. While the
+listener is down, has not delivered its first snapshot, or the
+collection outgrows MIRROR_MAX_BYTES, lookups return None and callers
+fall back to a direct query. Each mirror's state is exported on /metrics
+as the collection_mirror_* gauges.
+'''
+
+RESTART_BACKOFF_SECONDS = 30
+
+_mirrors = {}
+_mirrors_pid = None
+_mirrors_lock = threading.Lock()
+
+
+def _estimate_size(value):
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class CollectionMirror:
+    def __init__(self, db, collection_name, max_bytes):
+        self.db = db
+        self.collection_name = collection_name
+        self.max_bytes = max_bytes
+        self._docs = {}
+        self._sizes = {}
+        self._bytes = 0
+        self._ready = False
+        self._over_budget = False
+        self._watch = None
+        self._last_start = 0
+        self._listeners = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._over_budget:
+                return
+            self._last_start = time.monotonic()
+            self._ready = False
+            self._docs, self._sizes, self._bytes = {}, {}, 0
+            self._publish()
+        try:
+            self._watch = self.db.collection(self.collection_name).on_snapshot(self._on_snapshot)
+        except Exception:
+            logger.exception(f"Could not start mirror for {self.collection_name}")
+            self._watch = None
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        with self._lock:
+            self._ready = False
+            self._publish()
+
+    def _publish(self):
+        # Called with the lock held
+        MIRROR_READY.labels(self.collection_name).set(1 if self._ready else 0)
+        MIRROR_DOCUMENTS.labels(self.collection_name).set(len(self._docs))
+        MIRROR_BYTES.labels(self.collection_name).set(self._bytes)
+
+    def _on_snapshot(self, col_snapshot, changes, read_time):
+        with self._lock:
+            for change in changes:
+                doc_id = change.document.id
+                self._bytes -= self._sizes.pop(doc_id, 0)
+                self._docs.pop(doc_id, None)
+                if change.type.name != 'REMOVED':
+                    data = change.document.to_dict()
+                    size = _estimate_size(data)
+                    self._docs[doc_id] = data
+                    self._sizes[doc_id] = size
+                    self._bytes += size
+
+            if self._bytes > self.max_bytes:
+                # Too big to mirror; serve this collection with direct queries from now on
+                logger.warning(f"Mirror for {self.collection_name} exceeded {self.max_bytes} bytes, disabling")
+                self._over_budget = True
+                self._ready = False
+                self._docs, self._sizes, self._bytes = {}, {}, 0
+            else:
+                self._ready = True
+            self._publish()
+            listeners = list(self._listeners)
+
+        if self._over_budget and self._watch is not None:
+            threading.Thread(target=self.stop, daemon=True).start()
+
+        for listener in listeners:
+            try:
+                listener()
+            except Exception:
+                logger.exception(f"Mirror listener for {self.collection_name} failed")
+
+    def add_listener(self, callback):
+        """Call `callback` after every applied snapshot, e.g. to drop caches built on the mirror."""
+        with self._lock:
+            self._listeners.add(callback)
+
+    def is_ready(self):
+        if self._over_budget:
+            return False
+        if self._watch is None or not getattr(self._watch, 'is_active', True):
+            # Listener dropped; restart it, but not on every request
+            with self._lock:
+                restart = time.monotonic() - self._last_start > RESTART_BACKOFF_SECONDS
+                if restart:
+                    self._last_start = time.monotonic()
+            if restart:
+                self.start()
+            return False
+        return self._ready
+
+    def where(self, field=None, value=None):
+        """
+        Return [(doc_id, data)] for documents whose `field` equals `value`,
+        or every document when no field is given. Returns None when the
+        mirror cannot be trusted and the caller should query Firestore.
+        """
+        if not self.is_ready():
+            return None
+        with self._lock:
+            return [
+                (doc_id, dict(data)) for doc_id, data in self._docs.items()
+                if field is None or data.get(field) == value
+            ]
+
+    def get(self, doc_id):
+        """Return (found, data) for one document, or None to fall back."""
+        if not self.is_ready():
+            return None
+        with self._lock:
+            data = self._docs.get(doc_id)
+            return (data is not None, dict(data) if data is not None else None)
+
+
+def get_mirror(collection_name):
+    """
+    Return this worker's mirror of `collection_name`, starting it on
+    first use. Listeners are created after fork, never in a parent
+    process, because gRPC streams do not survive forking.
+    """
+    global _mirrors, _mirrors_pid
+    if not Config.MIRROR_ENABLED:
+        return None
+
+    with _mirrors_lock:
+        if _mirrors_pid != os.getpid():
+            _mirrors = {}
+            _mirrors_pid = os.getpid()
+        mirror = _mirrors.get(collection_name)
+        if mirror is None:
+            mirror = CollectionMirror(current_app.config['db'], collection_name, Config.MIRROR_MAX_BYTES)
+            _mirrors[collection_name] = mirror
+            mirror.start()
+    return mirror
+
+
+def mirror_where(collection_name, field=None, value=None, on_change=None):
+    """
+    Shortcut for handlers: mirrored rows, or None to query directly.
+    `on_change` is registered once and called whenever the mirror changes.
+    """
+    mirror = get_mirror(collection_name)
+    if mirror is None:
+        return None
+    if on_change is not None:
+        mirror.add_listener(on_change)
+    return mirror.where(field, value)
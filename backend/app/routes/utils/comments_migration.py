@@ -0,0 +1,139 @@
+import datetime
+from firebase_admin import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
+
+# Firestore rejects batches with more than 500 writes
+BATCH_LIMIT = 500
+# Firestore caps `in` filters at 30 values
+IN_LIMIT = 30
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(content):
+    """The start of a post's content, as the feed shows it."""
+    content = content or ''
+    return content if len(content) <= EXCERPT_LENGTH else content[:EXCERPT_LENGTH].rstrip() + '...'
+
+
+def _uids_by_email(db, emails):
+    uids = {}
+    emails = sorted(set(emails))
+    for start in range(0, len(emails), IN_LIMIT):
+        query = db.collection('Users').where('email', 'in', emails[start:start + IN_LIMIT]).select(['email'])
+        for doc in query.stream():
+            uids[doc.to_dict().get('email')] = doc.id
+    return uids
+
+
+@firestore.transactional
+def _finish_migration(transaction, post_ref, moved, liked_uids):
+    """
+    Adds the moved comments to the counter and drops the legacy arrays,
+    unless a concurrent migration of the same post already did. Returns
+    whether this run committed the migration.
+    """
+    snapshot = post_ref.get(transaction=transaction)
+    if not snapshot.exists or 'comments' not in snapshot.to_dict():
+        return False
+
+    post_data = snapshot.to_dict()
+    # Likes withdrawn since their markers were written must not come back
+    liked_by = post_data.get('liked_by') or []
+    for email, uid in liked_uids.items():
+        if email not in liked_by:
+            transaction.delete(post_ref.collection('likes').document(uid))
+
+    # Increment rather than set, new comments may already have bumped the counter
+    update = {
+        'comment_count': firestore.Increment(moved),
+        'comments': firestore.DELETE_FIELD,
+        'liked_by': firestore.DELETE_FIELD
+    }
+    if 'excerpt' not in post_data:
+        update['excerpt'] = make_excerpt(post_data.get('content'))
+    transaction.update(post_ref, update)
+    return True
+
+
+def migrate_post_comments(db, post_doc):
+    """
+    Moves the legacy `comments` array of a single post into the
+    `posts/{id}/comments` subcollection and its `liked_by` emails into
+    `posts/{id}/likes/{uid}` markers, and stores the feed excerpt.
+    The legacy `likes` count already includes those likes, so no
+    shards are written for them.
+
+    Comment and like docs get deterministic ids, so re-running after a
+    partial failure overwrites instead of duplicating. The post update
+    (count + removal of the arrays) is the last write, which makes it the commit
+    point: until it lands the post is still served from the array. It
+    runs in a transaction, so two migrations of the same post racing
+    each other count the comments once.
+    Returns the number of comments moved.
+    """
+    post_data = post_doc.to_dict()
+    comments = post_data.get('comments')
+    if comments is None:
+        return 0
+
+    post_ref = post_doc.reference
+    comments_ref = post_ref.collection('comments')
+
+    # Legacy comments have no timestamp; keep their order after the post's creation time
+    base_time = post_data.get('created_at')
+    if not isinstance(base_time, datetime.datetime):
+        base_time = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+    writes = []
+    for index, comment in enumerate(comments):
+        comment_data = comment if isinstance(comment, dict) else {'text': str(comment)}
+        writes.append((comments_ref.document(f'legacy-{index:05d}'), {
+            'user': comment_data.get('user', 'Anonymous'),
+            'text': comment_data.get('text', ''),
+            'uid': comment_data.get('uid'),
+            'created_at': base_time + datetime.timedelta(microseconds=index + 1)
+        }))
+
+    # Members who have since been deleted have no uid left to key a marker by
+    liked_by = [email for email in post_data.get('liked_by') or [] if email]
+    liked_uids = _uids_by_email(db, liked_by)
+    for email, uid in liked_uids.items():
+        writes.append((post_ref.collection('likes').document(uid), {
+            'uid': uid,
+            'email': email,
+            'created_at': base_time
+        }))
+
+    for start in range(0, len(writes), BATCH_LIMIT):
+        batch = db.batch()
+        for reference, data in writes[start:start + BATCH_LIMIT]:
+            batch.set(reference, data)
+        batch.commit()
+    if not _finish_migration(db.transaction(), post_ref, len(comments), liked_uids):
+        # A concurrent run of the same post got there first and counted these
+        return 0
+    return len(comments)
+
+
+def migrate_comments_page(db, limit: int = 50, start_after_id=None):
+    """
+    Migrates one page of posts ordered by document id.
+    Returns (migrated_posts, migrated_comments, next_page_token) so the
+    caller can resume from where the previous page stopped.
+    """
+    posts_ref = db.collection('posts')
+    query = posts_ref.order_by(FieldPath.document_id())
+    if start_after_id:
+        query = query.start_after({FieldPath.document_id(): start_after_id})
+
+    docs = list(query.limit(limit).stream())
+    migrated_posts = 0
+    migrated_comments = 0
+    for doc in docs:
+        if 'comments' not in doc.to_dict():
+            continue
+        migrated_comments += migrate_post_comments(db, doc)
+        migrated_posts += 1
+
+    next_page_token = docs[-1].id if len(docs) == limit else None
+    return migrated_posts, migrated_comments, next_page_token
@@ -0,0 +1,122 @@
+import zlib
+from flask import request
+from app.config import Config
+
+'''
+Negotiated gzip/brotli compression of responses.
+
+A response is compressed when the client accepts an encoding we
+support, its mimetype is text or JSON-like, it is not encoded already
+and it is at least COMPRESSION_MIN_SIZE bytes: compressing a few
+hundred bytes costs more CPU than it saves on the wire. Streamed responses (exports, bulk import
+results) are compressed chunk by chunk and flushed after each one, so
+they keep arriving incrementally. Brotli is used when the optional
+`brotli` package is installed and the client prefers or ties it.
+'''
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml', 'image/svg+xml'
+)
+
+_brotli = None
+_brotli_checked = False
+
+
+def _get_brotli():
+    global _brotli, _brotli_checked
+    if not _brotli_checked:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = None
+        _brotli_checked = True
+    return _brotli
+
+
+def _encodings():
+    return ('br', 'gzip') if _get_brotli() is not None else ('gzip',)
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+class _Compressor:
+    """One streaming compressor with the same interface for both encodings."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = _get_brotli().Compressor(quality=Config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits 31: gzip header and trailer
+            self._compressor = zlib.compressobj(Config.COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.process(data) if self.encoding == 'br' else self._compressor.compress(data)
+
+    def flush(self):
+        """Emit everything buffered so far, keeping the stream open."""
+        return self._compressor.flush() if self.encoding == 'br' else self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.finish() if self.encoding == 'br' else self._compressor.flush(zlib.Z_FINISH)
+
+
+def _compress_stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        # The server closes this generator; pass that on so stream_with_context can clean up
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    if not Config.COMPRESSION_ENABLED or request.method == 'HEAD':
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if 'Content-Encoding' in response.headers or not _compressible(response):
+        return response
+    # Files sent with send_file keep their Content-Length and range support
+    if response.direct_passthrough:
+        return response
+    if 'no-transform' in response.headers.get('Cache-Control', ''):
+        return response
+
+    # Whether or not we compress, the response depends on Accept-Encoding
+    response.vary.add('Accept-Encoding')
+
+    encoding = request.accept_encodings.best_match(_encodings())
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        compressor = _Compressor(encoding)
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop('Content-Length', None)
+    else:
+        if response.content_length is None or response.content_length < Config.COMPRESSION_MIN_SIZE:
+            return response
+        compressor = _Compressor(encoding)
+        response.set_data(compressor.compress(response.get_data()) + compressor.finish())
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed bytes differ from the representation the strong tag was made for
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
@@ -0,0 +1,73 @@
+import datetime
+import os
+import threading
+from app.config import Config
+
+# Firestore rejects batches with more than 500 writes
+BATCH_LIMIT = 500
+
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+
+def mark_past_events(db, now=None):
+    """
+    Flip every event whose start time has passed from 'upcoming' to
+    'past'. Uses the (status, starts_at) composite index, so each run
+    reads only the events that actually change. Returns how many did.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    query = db.collection('events') \
+        .where('status', '==', 'upcoming') \
+        .where('starts_at', '<', now) \
+        .order_by('starts_at') \
+        .limit(BATCH_LIMIT)
+
+    total = 0
+    while True:
+        docs = list(query.stream())
+        if not docs:
+            break
+
+        batch = db.batch()
+        for doc in docs:
+            batch.update(doc.reference, {'status': 'past'})
+        batch.commit()
+        total += len(docs)
+
+        # Updated docs drop out of the query, so the next page starts fresh
+        if len(docs) < BATCH_LIMIT:
+            break
+    return total
+
+
+def _run(app, stop_event):
+    interval = Config.EVENT_STATUS_INTERVAL
+    while True:
+        try:
+            updated = mark_past_events(app.config['db'])
+            if updated:
+                app.logger.info(f"Marked {updated} events as past")
+        except Exception:
+            app.logger.exception("Event status update failed")
+        if stop_event.wait(interval):
+            break
+
+
+def start_event_status_scheduler(app):
+    """
+    Start the background thread that keeps event statuses current.
+    Runs once per process, and again in a forked child since threads do
+    not survive fork; running it in several workers is harmless because
+    the update is idempotent.
+    """
+    global _scheduler_pid
+    with _scheduler_lock:
+        if _scheduler_pid == os.getpid() or Config.EVENT_STATUS_INTERVAL <= 0:
+            return None
+        _scheduler_pid = os.getpid()
+
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_run, args=(app, stop_event), name='event-status-scheduler', daemon=True)
+    thread.start()
+    return stop_event
@@ -0,0 +1,88 @@
+import datetime
+from zoneinfo import ZoneInfo
+from google.cloud.firestore_v1.field_path import FieldPath
+from app.config import Config
+
+EVENT_TZ = ZoneInfo(Config.EVENT_TIMEZONE)
+
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%B %d, %Y', '%b %d, %Y']
+# Shown to admins when a date matches none of DATE_FORMATS; ambiguous slashed dates are read day first
+DATE_FORMAT_HINT = "Unrecognized date, use yyyy-mm-dd, dd/mm/yyyy, mm/dd/yyyy or a date like 'March 5, 2025' / 'Mar 5, 2025'"
+TIME_FORMATS = ['%H:%M', '%H:%M:%S', '%I:%M %p', '%I:%M%p', '%I %p']
+
+
+def _parse(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_event_datetime(date_str, time_str=None):
+    """
+    Combine an event's free-form `date` and `time` strings into an aware
+    datetime in the club's timezone. A missing or unreadable time falls
+    back to midnight; an unreadable date returns None.
+    """
+    if not date_str:
+        return None
+
+    date = _parse(str(date_str).strip(), DATE_FORMATS)
+    if date is None:
+        return None
+
+    time = _parse(str(time_str).strip().upper(), TIME_FORMATS) if time_str else None
+    if time is not None:
+        date = date.replace(hour=time.hour, minute=time.minute, second=time.second)
+
+    return date.replace(tzinfo=EVENT_TZ)
+
+
+def parse_range_bound(value, end_of_day=False):
+    """
+    Parse an ISO date or datetime from a query string. Naive values are
+    read in the club's timezone; a bare date used as an upper bound
+    covers the whole day. Raises ValueError if the value is not ISO.
+    """
+    value = value.strip()
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=EVENT_TZ)
+    if end_of_day and len(value) == 10:
+        parsed += datetime.timedelta(days=1) - datetime.timedelta(microseconds=1)
+    return parsed
+
+
+def backfill_event_times(db, limit: int = 200, start_after_id=None):
+    """
+    Set `starts_at` on one page of events (ordered by document id) that
+    do not have it yet. Returns (updated, unparseable_ids, next_page_token).
+    """
+    events_ref = db.collection('events')
+    query = events_ref.order_by(FieldPath.document_id())
+    if start_after_id:
+        query = query.start_after({FieldPath.document_id(): start_after_id})
+
+    docs = list(query.limit(limit).stream())
+    batch = db.batch()
+    updated = 0
+    unparseable = []
+    for doc in docs:
+        data = doc.to_dict()
+        if data.get('starts_at') is not None:
+            continue
+        starts_at = parse_event_datetime(data.get('date'), data.get('time'))
+        if starts_at is None:
+            unparseable.append(doc.id)
+            continue
+        batch.update(doc.reference, {'starts_at': starts_at})
+        updated += 1
+
+    # limit is capped below Firestore's 500 writes per batch by the caller
+    if updated:
+        batch.commit()
+
+    next_page_token = docs[-1].id if len(docs) == limit else None
+    return updated, unparseable, next_page_token
@@ -0,0 +1,107 @@
+import csv
+import datetime
+import io
+import json
+import zlib
+from google.cloud.firestore_v1.field_path import FieldPath
+from app.config import Config
+
+'''
+Streaming exports of whole collections as NDJSON or CSV.
+
+Documents are read a page at a time, ordered by document id and resumed
+with start_after, and each page is encoded (and optionally gzipped) and
+handed to the response before the next one is fetched. Memory stays at
+one page however large the collection is, and the first bytes go out
+after the first page read instead of after the last.
+'''
+
+# export name: (collection, exported fields); the fields are also the CSV columns
+EXPORTS = {
+    'users': ('Users', (
+        'name', 'email', 'role', 'committee', 'is_admin', 'rank', 'points', 'memo_tokens', 'workshops'
+    )),
+    'projects': ('projects', (
+        'title', 'description', 'project_timeframe', 'author', 'author_email', 'github', 'committee',
+        'approved', 'is_approved', 'required_members', 'members', 'unknown_members', 'points',
+        'is_notified', 'is_completed', 'completion_requested', 'completion_request_date', 'created_at'
+    )),
+    'contributions': ('contributions', ('uid', 'name', 'title', 'timestamp')),
+    # Metadata only, files_data duplicates the photo urls with Cloudinary internals
+    'gallery': ('Gallery', ('title', 'author', 'author_id', 'photos', 'total_size_mb', 'created_at')),
+}
+FORMATS = ('ndjson', 'csv')
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+def iter_pages(db, collection, fields, page_size=None):
+    """Yield lists of (id, data) of at most `page_size` documents until the collection is exhausted."""
+    page_size = page_size or Config.EXPORT_PAGE_SIZE
+    query = db.collection(collection).select(list(fields)).order_by(FieldPath.document_id()).limit(page_size)
+    last_id = None
+    while True:
+        page_query = query.start_after({FieldPath.document_id(): last_id}) if last_id else query
+        page = [(doc.id, doc.to_dict()) for doc in page_query.stream()]
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1][0]
+
+
+def encode_pages(pages, fields, fmt):
+    """Yield one str per page, preceded by the header row for CSV."""
+    if fmt == 'ndjson':
+        for page in pages:
+            yield ''.join(
+                json.dumps({'id': doc_id} | {field: data.get(field) for field in fields}, default=_json_default) + '\n'
+                for doc_id, data in page
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(('id',) + tuple(fields))
+    for page in pages:
+        for doc_id, data in page:
+            writer.writerow([doc_id] + [_csv_value(data.get(field)) for field in fields])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty collection
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Gzip a stream of str chunks without holding more than one at a time."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(db, name, fmt, gzip=False):
+    """The response body for EXPORTS[name] in `fmt`, as a generator of bytes."""
+    collection, fields = EXPORTS[name]
+    chunks = encode_pages(iter_pages(db, collection, fields), fields, fmt)
+    if gzip:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
@@ -0,0 +1,82 @@
+import os
+import threading
+from app.config import Config
+from app.routes.utils.metrics import time_upstream
+
+'''
+Shared HTTP client for outbound REST calls.
+
+One requests.Session per worker process keeps TLS connections alive
+across requests. Every call has connect and read timeouts, so a stalled
+upstream cannot pin a worker. Connection failures are retried for any
+method, because the request never reached the server. Read errors and
+502/503/504 responses are only retried for idempotent methods.
+'''
+
+IDENTITYTOOLKIT_URL = 'https://identitytoolkit.googleapis.com/v1/accounts:{operation}'
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream timed out or could not be reached after the retries."""
+
+
+def get_session():
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            # Deferred so importing a blueprint stays cheap
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=Config.HTTP_MAX_RETRIES,
+                connect=Config.HTTP_MAX_RETRIES,
+                read=Config.HTTP_MAX_RETRIES,
+                status=Config.HTTP_MAX_RETRIES,
+                status_forcelist=(502, 503, 504),
+                backoff_factor=0.2,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+            _session_pid = os.getpid()
+    return _session
+
+
+def send_request(method, url, service, operation, timeout=None, **kwargs):
+    """
+    Send a request through the shared session and record its latency
+    under (service, operation). Raises UpstreamUnavailable on timeouts
+    and connection errors; HTTP error statuses are returned as-is.
+    """
+    import requests
+
+    timeout = timeout or (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+    try:
+        with time_upstream(service, operation):
+            return get_session().request(method, url, timeout=timeout, **kwargs)
+    except (requests.Timeout, requests.ConnectionError) as e:
+        # The message leaves out the URL and request details
+        raise UpstreamUnavailable(f'{service} {operation} failed: {type(e).__name__}') from e
+
+
+def identitytoolkit(operation, payload):
+    """POST to the Firebase Auth REST API and return the decoded JSON body."""
+    url = IDENTITYTOOLKIT_URL.format(operation=operation)
+    response = send_request(
+        'POST', url, 'identitytoolkit', operation,
+        # Sent as a header so the key stays out of URLs in logs
+        headers={'X-Goog-Api-Key': Config.FIREBASE_API_KEY}, json=payload
+    )
+    return response.json()
@@ -0,0 +1,226 @@
+import datetime
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from firebase_admin import firestore
+from flask import current_app
+from werkzeug.utils import secure_filename
+from app.config import Config
+from app.routes.utils.cloudinary_client import get_uploader
+
+logger = logging.getLogger(__name__)
+
+'''
+Background Cloudinary uploads for admin forms.
+
+The handler saves its document with `pending_image_fields()` (status
+"pending" plus a fresh upload id) and hands the file bytes and that id
+to `enqueue_image_upload`; a worker thread uploads them and patches
+`image_url` on the document. Failed attempts are retried with
+exponential backoff and end up as `image_status: "failed"` with the
+last error in `image_error`, so the admin UI can show it. Once the file
+is on Cloudinary only the document update is retried.
+
+The document update runs in a transaction that checks the upload id is
+still the document's, so when two uploads for one document finish out
+of order the older one loses, and its image is deleted again. The image
+it replaces is deleted once the new one is attached, as is any image
+that never makes it onto its document.
+
+Jobs live in this process. The sweeper thread marks uploads still
+pending after IMAGE_UPLOAD_STALE_AFTER seconds as failed, since a
+restart took their bytes with it, and the admin uploads them again.
+'''
+
+MAX_WORKERS = Config.IMAGE_UPLOAD_WORKERS
+MAX_ATTEMPTS = Config.IMAGE_UPLOAD_MAX_ATTEMPTS
+RETRY_BACKOFF_SECONDS = 2
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+# Collections whose documents get images through this queue
+SWEPT_COLLECTIONS = ('community_news', 'community_events')
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def _get_executor():
+    """Create the worker pool on first use, and again in a forked child."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='image-upload')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _upload(data: bytes, filename: str, folder: str):
+    """Upload the image, returning its (url, public_id)."""
+    public_id = f"{folder}/{uuid.uuid4()}_{secure_filename(filename)}"
+    result = get_uploader().upload(
+        io.BytesIO(data),
+        public_id=public_id,
+        folder=folder,
+        resource_type="image",
+        overwrite=True
+    )
+    url = result.get("secure_url")
+    if not url:
+        raise RuntimeError("No URL returned by Cloudinary")
+    return url, result.get("public_id", public_id)
+
+
+def _destroy(public_id):
+    try:
+        get_uploader().destroy(public_id, resource_type="image")
+    except Exception as e:
+        logger.warning(f"Could not delete image {public_id}: {str(e)}")
+
+
+def pending_image_fields():
+    """Fields that mark a document's image as queued; pass `image_upload_id` on to enqueue_image_upload."""
+    return {
+        'image_status': 'pending',
+        'image_upload_id': uuid.uuid4().hex,
+        'image_requested_at': firestore.SERVER_TIMESTAMP,
+        'image_error': None
+    }
+
+
+@firestore.transactional
+def _finish_upload(transaction, doc_ref, upload_id, fields):
+    """
+    Apply `fields` if the document still waits for this upload. Returns
+    (applied, public id of the image the document had before).
+    """
+    snapshot = doc_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        return False, None
+    data = snapshot.to_dict()
+    if data.get('image_upload_id') != upload_id:
+        return False, None
+    transaction.update(doc_ref, fields)
+    return True, data.get('image_public_id')
+
+
+def _run_job(db, doc_ref, upload_id, data, filename, folder, on_complete):
+    last_error = None
+    image_url = public_id = None
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            # Each upload creates a new asset, so upload once and retry only the update
+            if image_url is None:
+                image_url, public_id = _upload(data, filename, folder)
+            attached, previous_id = _finish_upload(db.transaction(), doc_ref, upload_id, {
+                'image_url': image_url,
+                'image_public_id': public_id,
+                'image_status': 'done',
+                'image_error': None,
+                'image_attempts': attempt,
+                'updated_at': firestore.SERVER_TIMESTAMP
+            })
+            if not attached:
+                logger.info(f"Dropping image upload for {doc_ref.path}, a newer upload or a delete replaced it")
+                _destroy(public_id)
+            elif previous_id and previous_id != public_id:
+                _destroy(previous_id)
+            break
+        except Exception as e:
+            last_error = e
+            logger.warning(f"Image upload attempt {attempt} for {doc_ref.path} failed: {str(e)}")
+            if attempt < MAX_ATTEMPTS:
+                time.sleep(RETRY_BACKOFF_SECONDS ** attempt)
+    else:
+        if public_id:
+            # Nothing refers to the uploaded image
+            _destroy(public_id)
+        try:
+            _finish_upload(db.transaction(), doc_ref, upload_id, {
+                'image_status': 'failed',
+                'image_error': str(last_error),
+                'image_attempts': MAX_ATTEMPTS
+            })
+        except Exception as e:
+            logger.warning(f"Could not record failed upload for {doc_ref.path}: {str(e)}")
+
+    if on_complete:
+        try:
+            on_complete()
+        except Exception:
+            logger.exception("Image upload callback failed")
+
+
+def enqueue_image_upload(doc_ref, file, folder, upload_id, on_complete=None):
+    """
+    Queue `file` (a werkzeug FileStorage) for upload and return right away.
+    `upload_id` is the `image_upload_id` the handler saved on the document.
+
+    The bytes are read now because the request stream is closed once the
+    handler returns. `on_complete` runs on the worker thread after the
+    document has been patched, e.g. to invalidate a listing cache.
+    """
+    data = file.read()
+    db = current_app.config['db']
+    _get_executor().submit(_run_job, db, doc_ref, upload_id, data, file.filename, folder, on_complete)
+
+
+def mark_stale_uploads(db, now=None):
+    """
+    Mark uploads pending for longer than IMAGE_UPLOAD_STALE_AFTER as
+    failed. Few documents are pending at a time, so they are filtered by
+    age here rather than with a composite index. Returns how many were.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    cutoff = now - datetime.timedelta(seconds=Config.IMAGE_UPLOAD_STALE_AFTER)
+    marked = 0
+    for collection in SWEPT_COLLECTIONS:
+        batch = db.batch()
+        stale = 0
+        for doc in db.collection(collection).where('image_status', '==', 'pending').stream():
+            data = doc.to_dict()
+            requested_at = data.get('image_requested_at') or data.get('updated_at') or data.get('created_at')
+            if isinstance(requested_at, datetime.datetime) and requested_at > cutoff:
+                continue
+            batch.update(doc.reference, {
+                'image_status': 'failed',
+                'image_error': 'The upload was interrupted, please upload the image again'
+            })
+            stale += 1
+        if stale:
+            batch.commit()
+            marked += stale
+    return marked
+
+
+def _sweep(app, stop_event):
+    while not stop_event.wait(Config.IMAGE_UPLOAD_STALE_AFTER):
+        try:
+            marked = mark_stale_uploads(app.config['db'])
+            if marked:
+                app.logger.warning(f"Marked {marked} interrupted image uploads as failed")
+        except Exception:
+            app.logger.exception("Stale image upload sweep failed")
+
+
+def start_image_upload_sweeper(app):
+    """Start the stale upload sweeper once per process, and again after a fork."""
+    global _sweeper_pid
+    with _sweeper_lock:
+        if _sweeper_pid == os.getpid() or Config.IMAGE_UPLOAD_STALE_AFTER <= 0:
+            return None
+        _sweeper_pid = os.getpid()
+
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_sweep, args=(app, stop_event), name='image-upload-sweeper', daemon=True)
+    thread.start()
+    return stop_event
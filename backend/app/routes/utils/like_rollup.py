@@ -0,0 +1,104 @@
+import os
+import threading
+from app.config import Config
+from app.routes.utils.sharded_counter import get_counts
+
+'''
+Debounced rollup of the sharded post like counters into `like_count`.
+
+Likes and unlikes only write a shard and call `mark_dirty(post_id)`. A
+background thread wakes every LIKE_ROLLUP_INTERVAL seconds, sums the
+shards of the posts marked since its last run with batched reads and
+writes each total in one batch, so a post taking a burst of likes has
+its document written once per interval instead of once per like, and
+no like ever waits on the post document.
+
+The rollup is a plain overwrite with the sum it read. Each post is
+rolled up once more on the run after its last change, which settles a
+total another worker overwrote with an older sum. Marks live in the
+process and are lost on restart; the next like on the post marks it
+again.
+'''
+
+LIKE_SHARDS = 10
+LIKE_SHARDS_COLLECTION = "like_shards"
+# Posts summed per batched read, each costing LIKE_SHARDS + 1 documents
+ROLLUP_CHUNK = 40
+
+_pending = set()
+_settling = set()
+_state_lock = threading.Lock()
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+
+def mark_dirty(post_id):
+    """Queue a post whose shards changed for the next rollup."""
+    with _state_lock:
+        _pending.add(post_id)
+
+
+def _roll_up_chunk(db, post_ids):
+    posts_ref = db.collection("posts")
+    post_refs = [posts_ref.document(post_id) for post_id in post_ids]
+    counts = get_counts(db, post_refs, LIKE_SHARDS, LIKE_SHARDS_COLLECTION)
+
+    batch = db.batch()
+    written = 0
+    # The pre-sharding `likes` field is frozen and counted on top of the shards
+    for post in db.get_all(post_refs, field_paths=["likes"]):
+        if not post.exists:
+            continue
+        legacy_likes = (post.to_dict() or {}).get("likes", 0) or 0
+        batch.update(post.reference, {"like_count": legacy_likes + counts.get(post.id, 0)})
+        written += 1
+    if written:
+        batch.commit()
+    return written
+
+
+def roll_up_likes(db):
+    """Write `like_count` for every post marked since the last run. Returns how many were written."""
+    global _pending, _settling
+    with _state_lock:
+        post_ids = sorted(_pending | _settling)
+        _settling, _pending = _pending, set()
+
+    written = 0
+    for start in range(0, len(post_ids), ROLLUP_CHUNK):
+        chunk = post_ids[start:start + ROLLUP_CHUNK]
+        try:
+            written += _roll_up_chunk(db, chunk)
+        except Exception:
+            # Try these again on the next run
+            with _state_lock:
+                _pending.update(chunk)
+            raise
+    return written
+
+
+def _run(app, stop_event):
+    interval = Config.LIKE_ROLLUP_INTERVAL
+    while not stop_event.wait(interval):
+        try:
+            roll_up_likes(app.config['db'])
+        except Exception:
+            app.logger.exception("Like count rollup failed")
+
+
+def start_like_rollup_scheduler(app):
+    """
+    Start the background thread that rolls up like counts. Runs once per
+    process, and again in a forked child since threads do not survive
+    fork; each worker rolls up the posts liked through it.
+    """
+    global _scheduler_pid
+    with _scheduler_lock:
+        if _scheduler_pid == os.getpid():
+            return None
+        _scheduler_pid = os.getpid()
+
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_run, args=(app, stop_event), name='like-rollup-scheduler', daemon=True)
+    thread.start()
+    return stop_event
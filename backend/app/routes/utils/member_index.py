@@ -0,0 +1,152 @@
+import bisect
+import os
+import threading
+import time
+from flask import current_app
+from app.config import Config
+
+'''
+In-process search index for the member directory.
+
+Built from one stream of the Users collection projected to the fields
+the directory shows. Name, name word and email keys are kept in sorted
+arrays, so a prefix search is a bisect plus a scan of the matches;
+substring searches and the committee, role and rank filters narrow the
+candidates with per-value id sets first. The handlers that create, edit
+or delete members update this worker's index in place. Other workers,
+and changes made elsewhere (points and rank updates), are picked up by
+rebuilding after MEMBER_INDEX_TTL seconds.
+'''
+
+FIELDS = ('name', 'email', 'committee', 'role', 'rank', 'points', 'is_admin')
+FILTERS = ('committee', 'role', 'rank')
+MATCH_MODES = ('prefix', 'substring')
+
+_index = None
+_index_pid = None
+_lock = threading.Lock()
+
+
+def _keys(member):
+    """Sorted-array keys for a member: the full name, each name word and the email."""
+    name = (member.get('name') or '').lower()
+    email = (member.get('email') or '').lower()
+    keys = {name, email} | set(name.split())
+    keys.discard('')
+    return keys
+
+
+class MemberIndex:
+    def __init__(self):
+        self._members = {}
+        self._keys = []
+        self._filters = {field: {} for field in FILTERS}
+        self._lock = threading.Lock()
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, db):
+        index = cls()
+        for doc in db.collection('Users').select(list(FIELDS)).stream():
+            index._add(doc.id, doc.to_dict())
+        index._keys.sort()
+        return index
+
+    def _add(self, uid, member, keep_sorted=False):
+        member = {field: member.get(field) for field in FIELDS}
+        self._members[uid] = member
+        for key in _keys(member):
+            if keep_sorted:
+                bisect.insort(self._keys, (key, uid))
+            else:
+                self._keys.append((key, uid))
+        for field in FILTERS:
+            self._filters[field].setdefault(member[field], set()).add(uid)
+
+    def _remove(self, uid):
+        member = self._members.pop(uid, None)
+        if member is None:
+            return None
+        for key in _keys(member):
+            position = bisect.bisect_left(self._keys, (key, uid))
+            if position < len(self._keys) and self._keys[position] == (key, uid):
+                del self._keys[position]
+        for field in FILTERS:
+            ids = self._filters[field].get(member[field])
+            if ids is not None:
+                ids.discard(uid)
+                if not ids:
+                    del self._filters[field][member[field]]
+        return member
+
+    def upsert(self, uid, changes):
+        """Add a member, or merge `changes` into the indexed one."""
+        with self._lock:
+            member = self._remove(uid) or {}
+            self._add(uid, member | changes, keep_sorted=True)
+
+    def remove(self, uid):
+        with self._lock:
+            self._remove(uid)
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._keys, (prefix,))
+        matches = set()
+        for key, uid in self._keys[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.add(uid)
+        return matches
+
+    def search(self, query='', match='prefix', filters=None):
+        """
+        Return [(uid, member)] sorted by name then uid. `query` is matched
+        case-insensitively against the name, its words and the email.
+        """
+        query = (query or '').strip().lower()
+        with self._lock:
+            candidates = None
+            for field, value in (filters or {}).items():
+                ids = self._filters[field].get(value, set())
+                candidates = ids if candidates is None else candidates & ids
+
+            if query and match == 'prefix':
+                found = self._prefix_matches(query)
+                candidates = found if candidates is None else candidates & found
+            elif candidates is None:
+                candidates = self._members.keys()
+
+            rows = [(uid, dict(self._members[uid])) for uid in candidates]
+
+        if query and match == 'substring':
+            rows = [
+                (uid, member) for uid, member in rows
+                if query in (member['name'] or '').lower() or query in (member['email'] or '').lower()
+            ]
+        rows.sort(key=lambda row: ((row[1]['name'] or '').lower(), row[0]))
+        return rows
+
+
+def get_member_index():
+    """This worker's index, built on first use and rebuilt once older than MEMBER_INDEX_TTL."""
+    global _index, _index_pid
+    index = _index
+    if index is not None and _index_pid == os.getpid() and time.monotonic() - index.built_at < Config.MEMBER_INDEX_TTL:
+        return index
+
+    with _lock:
+        if _index is None or _index_pid != os.getpid() or time.monotonic() - _index.built_at >= Config.MEMBER_INDEX_TTL:
+            _index = MemberIndex.build(current_app.config['db'])
+            _index_pid = os.getpid()
+        return _index
+
+
+def index_member(uid, changes):
+    """Apply a create or edit to this worker's index if it has been built."""
+    if _index is not None and _index_pid == os.getpid():
+        _index.upsert(uid, changes)
+
+
+def unindex_member(uid):
+    if _index is not None and _index_pid == os.getpid():
+        _index.remove(uid)
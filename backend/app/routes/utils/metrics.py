@@ -0,0 +1,103 @@
+import os
+import time
+from contextlib import contextmanager
+from flask import g, request, Response
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+)
+
+'''
+Prometheus metrics for every route and for the upstream services the
+handlers call (Firebase Auth, the identitytoolkit REST API, Cloudinary).
+
+Exposed on /metrics in the Prometheus text format. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR so each worker writes its samples to disk and
+/metrics aggregates them; otherwise a scrape only sees one worker.
+'''
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+UNMATCHED = 'unmatched'
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request',
+    ['method', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Requests currently being handled',
+    ['method', 'endpoint'], multiprocess_mode='livesum'
+)
+RESPONSES = Counter(
+    'http_responses_total', 'Responses sent, by status code',
+    ['method', 'endpoint', 'status']
+)
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Time spent waiting on an upstream service',
+    ['service', 'operation', 'outcome'], buckets=LATENCY_BUCKETS
+)
+# Per worker, since each worker keeps its own mirrors
+MIRROR_READY = Gauge(
+    'collection_mirror_ready', 'Whether the collection mirror is serving reads',
+    ['collection'], multiprocess_mode='liveall'
+)
+MIRROR_DOCUMENTS = Gauge(
+    'collection_mirror_documents', 'Documents held by the collection mirror',
+    ['collection'], multiprocess_mode='liveall'
+)
+MIRROR_BYTES = Gauge(
+    'collection_mirror_bytes', 'Estimated memory held by the collection mirror',
+    ['collection'], multiprocess_mode='liveall'
+)
+
+
+@contextmanager
+def time_upstream(service, operation):
+    """
+    Record how long the wrapped call to `service` took, labelled with
+    whether it raised:
+
+        with time_upstream('firebase_auth', 'create_user'):
+            auth.create_user(...)
+    """
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        UPSTREAM_LATENCY.labels(service, operation, outcome).observe(time.perf_counter() - started)
+
+
+def _labels():
+    # The endpoint name, not the path, keeps label cardinality bounded
+    return request.method, request.endpoint or UNMATCHED
+
+
+def init_metrics(app):
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.labels(*_labels()).inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            method, endpoint = _labels()
+            REQUEST_LATENCY.labels(method, endpoint).observe(time.perf_counter() - started)
+            RESPONSES.labels(method, endpoint, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        # Runs even when the request failed, so the gauge cannot drift upward
+        if g.pop('metrics_started', None) is not None:
+            REQUESTS_IN_PROGRESS.labels(*_labels()).dec()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        registry = REGISTRY
+        if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,19 +1,35 @@
 import datetime
+import logging
 from firebase_admin import firestore
 
+logger = logging.getLogger(__name__)
+
+def _notification(title, message, notification_type, to_email, project_id, from_email, uid, read_status):
+    return {
+        "title": title,
+        "message": message,
+        "type": notification_type,
+        "to_email": to_email,
+        "project_id": project_id,
+        "from_email": from_email,
+        "read_status": read_status,
+        "uid": uid,
+        "created_at": firestore.SERVER_TIMESTAMP  # Better than utcnow() for Firestore
+    }
+
 def send_notification(db, title, message, notification_type, to_email, project_id, from_email="ishannepal", uid=None, read_status=False):
     try:
-        db.collection('notifications').add({
-            "title": title,
-            "message": message,
-            "type": notification_type,
-            "to_email": to_email,
-            "project_id": project_id,
-            "from_email": from_email,
-            "read_status": read_status,
-            "uid": uid,
-            "created_at": firestore.SERVER_TIMESTAMP  # Better than utcnow() for Firestore
-        })
-    except Exception as e:
-        # Log error if needed
-        print(f"Error sending notification: {str(e)}")
\ No newline at end of file
+        db.collection('notifications').add(
+            _notification(title, message, notification_type, to_email, project_id, from_email, uid, read_status)
+        )
+    except Exception:
+        logger.exception("Error sending notification")
+
+async def send_notification_async(db, title, message, notification_type, to_email, project_id, from_email="ishannepal", uid=None, read_status=False):
+    """send_notification for async views, `db` being an AsyncDatastore."""
+    try:
+        await db.collection('notifications').add(
+            _notification(title, message, notification_type, to_email, project_id, from_email, uid, read_status)
+        )
+    except Exception:
+        logger.exception("Error sending notification")
\ No newline at end of file
@@ -0,0 +1,50 @@
+from flask import request
+
+
+def parse_page_args(default_limit: int = 20, max_limit: int = 50):
+    """
+    Reads `limit` and `start_after` from the query string.
+    Raises ValueError with a client-facing message if `limit` is not a number.
+    """
+    limit_param = request.args.get('limit', str(default_limit))
+    try:
+        limit = max(1, min(int(limit_param), max_limit))
+    except ValueError:
+        raise ValueError('Invalid limit parameter')
+
+    start_after = request.args.get('start_after') or None
+    return limit, start_after
+
+
+def paginate_query(query, collection_ref, limit: int, start_after_id=None):
+    """
+    Runs `query` one page at a time using a document id as the cursor.
+    Returns (docs, next_page_token); the token is None on the last page.
+    Raises ValueError if the cursor document does not exist.
+    """
+    if start_after_id:
+        last_doc = collection_ref.document(start_after_id).get()
+        if not last_doc.exists:
+            raise ValueError('Invalid start_after token')
+        query = query.start_after(last_doc)
+
+    docs = list(query.limit(limit).stream())
+    next_page_token = docs[-1].id if len(docs) == limit else None
+    return docs, next_page_token
+
+
+def paginate_rows(rows, limit: int, start_after_id=None):
+    """
+    In-memory counterpart of `paginate_query` for already sorted
+    (doc_id, data) rows, using the same id-based cursor.
+    """
+    start = 0
+    if start_after_id:
+        ids = [doc_id for doc_id, _ in rows]
+        if start_after_id not in ids:
+            raise ValueError('Invalid start_after token')
+        start = ids.index(start_after_id) + 1
+
+    page = rows[start:start + limit]
+    next_page_token = page[-1][0] if len(page) == limit else None
+    return page, next_page_token
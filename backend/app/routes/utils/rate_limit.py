@@ -0,0 +1,155 @@
+import collections
+import logging
+import math
+import os
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+'''
+Rate limiting for the auth endpoints, checked before any call to Firebase.
+
+Each rule allows `limit` requests per `period` seconds for one key (the
+client IP or the email in the body). In a single worker the default
+MemoryStore keeps a token bucket per key: two numbers, with the least
+recently used keys evicted past RATE_LIMIT_MAX_KEYS. Multi-worker
+deployments set RATE_LIMIT_STORE=redis to share a sliding-window
+counter (two counters per key, expired by Redis), or inject any object
+with a `hit(key, limit, period)` method as app.config['RATE_LIMIT_STORE'].
+
+The client IP is request.remote_addr. Behind a reverse proxy that is
+the proxy's address, so every client would share one bucket: set
+TRUSTED_PROXY_HOPS to the number of proxies in front of the app and
+create_app wraps it in ProxyFix, taking the IP from the X-Forwarded-For
+entry the outermost of them added. It is 0 by default because a client
+talking to the app directly could otherwise pick its own IP.
+'''
+
+# endpoint: [(key kind, limit, period seconds)]
+RULES = {
+    'login': [('ip', 20, 60), ('email', 5, 60)],
+    'register': [('ip', 5, 600)],
+    'forgotpassword': [('ip', 5, 600), ('email', 3, 900)],
+}
+
+
+class MemoryStore:
+    """Per-process token buckets with LRU eviction."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period):
+        """Take one token. Returns 0 if allowed, else seconds until one is available."""
+        rate = limit / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisStore:
+    """
+    Sliding-window counter shared by all workers: the previous window's
+    count is weighted by how much of it still overlaps the last `period`.
+    """
+
+    def __init__(self, client, prefix='ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        window = int(now // period)
+        current_key = f'{self.prefix}{key}:{window}'
+        previous_key = f'{self.prefix}{key}:{window - 1}'
+
+        pipe = self.client.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, period * 2)
+        pipe.get(previous_key)
+        current, _, previous = pipe.execute()
+
+        elapsed = now - window * period
+        weighted = int(previous or 0) * (1 - elapsed / period) + current
+        if weighted <= limit:
+            return 0
+        return period - elapsed
+
+
+_store = None
+_store_pid = None
+_lock = threading.Lock()
+
+
+def get_store():
+    global _store, _store_pid
+    injected = current_app.config.get('RATE_LIMIT_STORE')
+    if injected is not None and not isinstance(injected, str):
+        return injected
+
+    if _store is not None and _store_pid == os.getpid():
+        return _store
+    with _lock:
+        if _store is None or _store_pid != os.getpid():
+            if Config.RATE_LIMIT_STORE == 'redis':
+                import redis
+                _store = RedisStore(redis.Redis.from_url(Config.RATE_LIMIT_REDIS_URL, socket_timeout=0.2))
+            else:
+                _store = MemoryStore(Config.RATE_LIMIT_MAX_KEYS)
+            _store_pid = os.getpid()
+    return _store
+
+
+def _key_value(kind):
+    if kind == 'ip':
+        return request.remote_addr
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def rate_limited(name):
+    """Reject the request with 429 and Retry-After when any rule for `name` is exhausted."""
+    rules = RULES[name]
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not Config.RATE_LIMIT_ENABLED:
+                return fn(*args, **kwargs)
+
+            retry_after = 0
+            try:
+                store = get_store()
+                for kind, limit, period in rules:
+                    value = _key_value(kind)
+                    if value:
+                        retry_after = max(retry_after, store.hit(f'{name}:{kind}:{value}', limit, period))
+            except Exception as e:
+                # A broken shared store must not lock everyone out
+                logger.warning(f"Rate limit check for {name} failed, allowing request: {str(e)}")
+                retry_after = 0
+
+            if retry_after > 0:
+                response = jsonify({'msg': 'Too many requests, please try again later'})
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response, 429
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
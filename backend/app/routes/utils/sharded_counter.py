@@ -0,0 +1,45 @@
+import random
+from firebase_admin import firestore
+
+'''
+Counters that take many concurrent writes are spread over N shard docs
+in a subcollection, each holding a partial `count`. Writers bump one
+random shard, readers sum all of them. Shards are created lazily by
+the first increment that lands on them.
+'''
+
+DEFAULT_SHARDS = 10
+
+
+def shard_refs(counter_ref, num_shards: int = DEFAULT_SHARDS, collection: str = 'shards'):
+    """Return the document references of every shard under `counter_ref`."""
+    shards_ref = counter_ref.collection(collection)
+    return [shards_ref.document(str(i)) for i in range(num_shards)]
+
+
+def increment_shard(writer, counter_ref, amount: int = 1, num_shards: int = DEFAULT_SHARDS, collection: str = 'shards'):
+    """
+    Queue an increment of a random shard on `writer`, which may be a
+    batch or a transaction, so it commits together with the caller's
+    other writes.
+    """
+    shard_ref = counter_ref.collection(collection).document(str(random.randrange(num_shards)))
+    writer.set(shard_ref, {'count': firestore.Increment(amount)}, merge=True)
+
+
+def get_counts(db, counter_refs, num_shards: int = DEFAULT_SHARDS, collection: str = 'shards'):
+    """
+    Sum the shards of several counters in one batched read.
+    Returns a dict keyed by counter document id.
+    """
+    counts = {ref.id: 0 for ref in counter_refs}
+    refs = [shard for ref in counter_refs for shard in shard_refs(ref, num_shards, collection)]
+    if not refs:
+        return counts
+
+    for shard in db.get_all(refs):
+        if shard.exists:
+            # Shard path is <counter>/<collection>/<n>, the counter is two levels up
+            counter_id = shard.reference.parent.parent.id
+            counts[counter_id] += shard.to_dict().get('count', 0)
+    return counts
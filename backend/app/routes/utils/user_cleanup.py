@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from firebase_admin import firestore
+from app.routes.utils.cloudinary_client import get_uploader
+
+logger = logging.getLogger(__name__)
+
+'''
+Background cleanup of everything a deleted member leaves behind.
+
+delete_user removes the Auth account and the Users document, records
+the member's uid, email and name in `user_deletions/{uid}` and queues
+`cleanup_user`. A worker thread then works through each step with an
+equality or array_contains query, one page of at most BATCH_LIMIT
+documents at a time: every page is deleted or patched in one batch, so
+it drops out of the next query, and the step's count on the progress
+document is bumped. Each step is idempotent, so a cleanup interrupted
+by a restart is finished by queueing it again.
+
+Project members are stored by display name, which is not unique, so a
+name is only taken out of `members` when no other member has it; its
+uid always leaves `member_uids`. A name that is kept is recorded on the
+progress document for an admin to review.
+'''
+
+# Firestore rejects batches with more than 500 writes
+BATCH_LIMIT = 500
+STEPS = ('gallery', 'contributions', 'notifications_received', 'notifications_sent', 'projects_requested', 'projects_joined')
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Create the worker on first use, and again in a forked child."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # One thread: cleanups are rare and should not compete with requests
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='user-cleanup')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _destroy_gallery_images(doc):
+    """Delete a memory's Cloudinary images, returning the public ids that could not be deleted."""
+    failed = []
+    for file_info in doc.to_dict().get('files_data', []):
+        public_id = file_info.get('public_id')
+        if not public_id:
+            continue
+        try:
+            result = get_uploader().destroy(public_id, resource_type='image')
+            if result.get('result') not in ('ok', 'not found'):
+                failed.append(public_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete Cloudinary image {public_id}: {str(e)}")
+            failed.append(public_id)
+    return failed
+
+
+def _queries(db, member, strip_name=True):
+    """
+    step: (query, write) where write(batch, doc) deletes or patches one dependent.
+    Without `strip_name` the member's name is left in project `members`.
+    """
+    uid, email, name = member['uid'], member.get('email'), member.get('name')
+
+    def delete(batch, doc):
+        batch.delete(doc.reference)
+
+    queries = {
+        'gallery': (db.collection('Gallery').where('author_id', '==', uid), delete),
+        'contributions': (db.collection('contributions').where('uid', '==', uid), delete),
+        # Join requests the member sent; the uid field is the sender
+        'notifications_sent': (db.collection('notifications').where('uid', '==', uid), delete),
+        'projects_requested': (
+            db.collection('projects').where('unknown_members', 'array_contains', uid),
+            lambda batch, doc: batch.update(doc.reference, {'unknown_members': firestore.ArrayRemove([uid])})
+        ),
+    }
+    if email:
+        queries['notifications_received'] = (db.collection('notifications').where('to_email', '==', email), delete)
+    if name and strip_name:
+        # Approved members are stored by name, either as a string or as {'name': ...}
+        entries = [name, {'name': name}]
+        queries['projects_joined'] = (
+            db.collection('projects').where('members', 'array_contains_any', entries),
+            lambda batch, doc: batch.update(doc.reference, {
+                'members': firestore.ArrayRemove(entries),
+                'member_uids': firestore.ArrayRemove([uid])
+            })
+        )
+    else:
+        # The name entry may be a namesake's, so only the uid is taken out
+        queries['projects_joined'] = (
+            db.collection('projects').where('member_uids', 'array_contains', uid),
+            lambda batch, doc: batch.update(doc.reference, {'member_uids': firestore.ArrayRemove([uid])})
+        )
+    return queries
+
+
+def _name_taken(db, uid, name):
+    """Whether a member other than `uid` goes by `name`."""
+    return any(doc.id != uid for doc in db.collection('Users').where('name', '==', name).limit(2).stream())
+
+
+def cleanup_user(db, uid):
+    """Run every cleanup step for the member recorded in user_deletions/{uid}."""
+    progress_ref = db.collection('user_deletions').document(uid)
+    progress_doc = progress_ref.get()
+    if not progress_doc.exists:
+        logger.warning(f"No deletion record for user {uid}, nothing to clean up")
+        return
+
+    member = progress_doc.to_dict()
+    progress_ref.update({'status': 'running', 'error': None, 'updated_at': firestore.SERVER_TIMESTAMP})
+    failed_images = []
+    try:
+        name_kept = bool(member.get('name')) and _name_taken(db, uid, member['name'])
+        queries = _queries(db, member, strip_name=not name_kept)
+        for step in STEPS:
+            if step not in queries:
+                continue
+            query, write = queries[step]
+            while True:
+                docs = list(query.limit(BATCH_LIMIT).stream())
+                if not docs:
+                    break
+                batch = db.batch()
+                for doc in docs:
+                    if step == 'gallery':
+                        failed_images += _destroy_gallery_images(doc)
+                    write(batch, doc)
+                batch.update(progress_ref, {
+                    f'counts.{step}': firestore.Increment(len(docs)),
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                })
+                batch.commit()
+
+        result = {'status': 'done', 'updated_at': firestore.SERVER_TIMESTAMP}
+        if name_kept:
+            result['kept_member_name'] = member['name']
+        if failed_images:
+            # Their memories are gone, so this is the only record left of them
+            result['failed_images'] = firestore.ArrayUnion(failed_images)
+        progress_ref.update(result)
+        logger.info(f"Cleaned up data of deleted user {uid}")
+    except Exception as e:
+        logger.exception(f"Cleanup of deleted user {uid} failed")
+        progress_ref.update({'status': 'failed', 'error': str(e), 'updated_at': firestore.SERVER_TIMESTAMP})
+
+
+def enqueue_user_cleanup(db, member):
+    """
+    Record the deleted member and queue the cleanup, returning right away.
+    `member` needs the uid, and the email and name the dependents refer to.
+    """
+    db.collection('user_deletions').document(member['uid']).set({
+        'uid': member['uid'],
+        'email': member.get('email'),
+        'name': member.get('name'),
+        'status': 'queued',
+        'counts': {step: 0 for step in STEPS},
+        'created_at': firestore.SERVER_TIMESTAMP,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }, merge=True)
+    _get_executor().submit(cleanup_user, db, member['uid'])
+
+
+def retry_user_cleanup(db, uid):
+    """Queue an unfinished cleanup again. Returns False if there is no record of it."""
+    if not db.collection('user_deletions').document(uid).get().exists:
+        return False
+    _get_executor().submit(cleanup_user, db, uid)
+    return True
@@ -1,7 +1,12 @@
-from flask import request, jsonify
+import logging
+from flask import request, jsonify, current_app
 import firebase_admin
 from firebase_admin import auth
 from functools import wraps
+from app.routes.utils.metrics import time_upstream
+from app.datastore.aio import run_blocking
+
+logger = logging.getLogger(__name__)
 
 def get_current_user():
     """
@@ -10,14 +15,17 @@ def get_current_user():
     """
     try:
         # The cookie name your frontend sets (adjust if needed)
-        print(request.cookies)
         session_cookie = request.cookies.get('session')
-        print(session_cookie)
         if not session_cookie:
             return None  # No token provided
         
-        decoded_token = auth.verify_session_cookie(session_cookie, check_revoked=True)
-        print(decoded_token)
+        # Benchmarks and local runs can swap in their own verifier
+        verifier = current_app.config.get('SESSION_VERIFIER')
+        if verifier is not None:
+            decoded_token = verifier(session_cookie)
+        else:
+            with time_upstream('firebase_auth', 'verify_session_cookie'):
+                decoded_token = auth.verify_session_cookie(session_cookie, check_revoked=True)
         user = {
             "uid": decoded_token['uid'],
             "email": decoded_token['email'],
@@ -28,8 +36,14 @@ def get_current_user():
         return user
 
     except auth.ExpiredIdTokenError:
-        print("⚠️ Token expired.")
+        logger.info("Session cookie expired")
         return None
     except Exception as e:
-        print("⚠️ Error verifying token:", e)
-        return None
\ No newline at end of file
+        # Never log the cookie itself, only why it was rejected
+        logger.warning(f"Could not verify session cookie: {type(e).__name__}: {str(e)}")
+        return None
+
+
+async def get_current_user_async():
+    """get_current_user for async views; verifying the cookie can call Firebase Auth."""
+    return await run_blocking(get_current_user)
\ No newline at end of file
@@ -0,0 +1,230 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+from app.datastore import MemoryFirestore
+from benchmarks.seed import seed
+
+'''
+Endpoint benchmarks against the in-memory data backend.
+
+    cd backend
+    python -m benchmarks.bench_endpoints --requests 300 --concurrency 8
+
+Boots create_app() with a seeded MemoryFirestore, drives each endpoint
+below with `concurrency` threads and prints p50/p95/p99 latency,
+throughput and data-store operations per request. Results are written as
+JSON under benchmarks/results/ named after the current commit; pass
+`--baseline <file>` to print the p95 change against an earlier run.
+
+Latencies measure the Flask stack and handler code only; there is no
+network round trip to Firestore, so compare runs with each other rather
+than with production numbers.
+'''
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+PERCENTILES = (50, 95, 99)
+
+
+def endpoints(ids):
+    """(name, method, path factory, json body factory or None, user factory)."""
+    member = lambda rng: rng.choice(ids['users'])
+    admin = lambda rng: ids['admin']
+    anonymous = lambda rng: None
+    return [
+        ('leaderboard', 'GET', lambda rng: '/api/leaderboard/get-leaderboard', None, anonymous),
+        ('dashboard', 'GET', lambda rng: '/api/dashboard/dashboard', None, member),
+        ('admin_dashboard', 'GET', lambda rng: '/api/dashboard/admin-dashboard', None, admin),
+        ('all_users', 'GET', lambda rng: '/api/users/get-all-users', None, admin),
+        ('projects', 'GET', lambda rng: '/api/projects/projects', None, anonymous),
+        ('approved_projects', 'GET', lambda rng: '/api/projects/get-approved-projects', None, member),
+        ('project', 'GET', lambda rng: f'/api/projects/get-project/{rng.choice(ids["projects"])}', None, anonymous),
+        ('user_projects', 'GET', lambda rng: '/api/projects/projects/user/get-projects', None, member),
+        ('notifications', 'GET', lambda rng: '/api/notifications/get-notifications', None, member),
+        ('admin_notifications', 'GET', lambda rng: '/api/notifications/get-notifications', None, admin),
+        ('memories', 'GET', lambda rng: '/api/gallery/memories', None, member),
+        ('events', 'GET', lambda rng: '/api/events/events', None, member),
+        ('events_upcoming', 'GET', lambda rng: '/api/events/events?when=upcoming', None, member),
+        ('news', 'GET', lambda rng: '/api/news/news', None, member),
+        ('community_events', 'GET', lambda rng: '/api/community/events', None, member),
+        ('workshops', 'GET', lambda rng: '/api/workshops/workshops', None, member),
+        ('bod', 'GET', lambda rng: '/api/bod/bod', None, anonymous),
+        ('posts', 'GET', lambda rng: '/api/posts/posts', None, member),
+        ('feed', 'GET', lambda rng: '/api/posts/feed', None, member),
+        ('like_post', 'POST', lambda rng: f'/api/posts/posts/{rng.choice(ids["posts"])}/like', None, member),
+        ('comment_post', 'POST', lambda rng: f'/api/posts/posts/{rng.choice(ids["posts"])}/comment',
+         lambda rng: {'comment': 'Nice work!'}, member),
+        ('polls', 'GET', lambda rng: '/api/polls/polls', None, member),
+        ('vote', 'POST', lambda rng: f'/api/polls/polls/{rng.choice(ids["active_polls"])}/vote',
+         lambda rng: {'option_id': str(rng.randrange(4))}, member),
+    ]
+
+
+def make_verifier(db):
+    """Session verifier that treats the cookie value as a seeded user id."""
+    users = {}
+
+    def verify(cookie):
+        if cookie not in users:
+            user_doc = db.collection('Users').document(cookie).get()
+            if not user_doc.exists:
+                raise ValueError('Unknown benchmark user')
+            data = user_doc.to_dict()
+            users[cookie] = {
+                'uid': cookie,
+                'email': data['email'],
+                'name': data['name'],
+                'is_admin': data.get('is_admin', False),
+            }
+        return users[cookie]
+
+    return verify
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_endpoint(app, db, spec, total_requests, concurrency, seed_value):
+    name, method, path_for, body_for, user_for = spec
+    counter = iter(range(total_requests))
+    counter_lock = threading.Lock()
+    latencies = []
+    statuses = {}
+    results_lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(f'{seed_value}-{name}-{worker_id}')
+        client = app.test_client()
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    return
+            uid = user_for(rng)
+            if uid:
+                client.set_cookie('session', uid)
+            else:
+                client.delete_cookie('session')
+            path = path_for(rng)
+            body = body_for(rng) if body_for else None
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = (time.perf_counter() - started) * 1000
+            with results_lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    ops_before = dict(db.stats)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+    ops = {key: db.stats[key] - ops_before[key] for key in db.stats}
+
+    latencies.sort()
+    result = {
+        'method': method,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'ops_per_request': {key: round(value / max(len(latencies), 1), 2) for key, value in ops.items()},
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        result[f'p{pct}_ms'] = round(value, 3) if value is not None else None
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(results, baseline=None):
+    header = f"{'endpoint':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'reads':>8}{'writes':>8}  status"
+    if baseline:
+        header += '   p95 vs baseline'
+    print(header)
+    for name, result in results.items():
+        ops = result['ops_per_request']
+        line = (
+            f"{name:<22}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+            f"{result['throughput_rps']:>9.1f}{ops['reads']:>8.1f}{ops['writes']:>8.1f}  "
+            f"{','.join(f'{code}x{count}' for code, count in result['statuses'].items())}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous.get('p95_ms'):
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            line += f'   {change:+.0f}%'
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark API endpoints against the in-memory backend.')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent clients per endpoint')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the seeded volumes')
+    parser.add_argument('--only', help='comma separated endpoint names to run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='result file, defaults to benchmarks/results/<commit>.json')
+    parser.add_argument('--baseline', help='earlier result file to compare p95 against')
+    args = parser.parse_args(argv)
+
+    db = MemoryFirestore()
+    seed_started = time.perf_counter()
+    ids = seed(db, scale=args.scale, seed_value=args.seed)
+    print(f'Seeded in {time.perf_counter() - seed_started:.1f}s')
+
+    app = create_app({'db': db, 'SESSION_VERIFIER': make_verifier(db)})
+
+    specs = endpoints(ids)
+    if args.only:
+        wanted = set(args.only.split(','))
+        specs = [spec for spec in specs if spec[0] in wanted]
+
+    results = {}
+    for spec in specs:
+        results[spec[0]] = run_endpoint(app, db, spec, args.requests, args.concurrency, args.seed)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['endpoints']
+    print_report(results, baseline)
+
+    revision = git_revision()
+    output = args.output or os.path.join(RESULTS_DIR, f'{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'settings': {
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'scale': args.scale,
+                'seed': args.seed,
+            },
+            'cold_start_ms': round(app.config.get('COLD_START_MS', 0), 1),
+            'endpoints': results,
+        }, f, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
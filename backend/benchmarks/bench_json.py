@@ -0,0 +1,95 @@
+import argparse
+import datetime
+import time
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from app.datastore import MemoryFirestore
+from app.json_provider import FirestoreJSONProvider
+from benchmarks.seed import seed
+
+'''
+JSON serialization benchmark: Flask's default provider against the
+orjson-based FirestoreJSONProvider.
+
+    cd backend
+    python -m benchmarks.bench_json --scale 1 --repeat 20
+
+Builds the payloads of the large list endpoints from a seeded
+MemoryFirestore, with timestamps turned into DatetimeWithNanoseconds as
+the Firestore client returns them, and times building the JSON response
+for each payload with both providers. Reports the best of `repeat` runs.
+'''
+
+# name: (collection, order field or None)
+PAYLOADS = {
+    'users.get_all_users': ('Users', None),
+    'leaderboard.get_leaderboard': ('Users', 'points'),
+    'projects.get_projects': ('projects', 'created_at'),
+    'gallery.get_all_memories': ('Gallery', 'created_at'),
+    'posts.get_all_posts': ('posts', 'created_at'),
+    'news.get_all_news': ('community_news', 'created_at'),
+}
+
+
+def _as_firestore(value):
+    if isinstance(value, datetime.datetime):
+        return DatetimeWithNanoseconds(
+            value.year, value.month, value.day, value.hour, value.minute, value.second,
+            value.microsecond, tzinfo=value.tzinfo or datetime.timezone.utc
+        )
+    if isinstance(value, dict):
+        return {key: _as_firestore(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_as_firestore(item) for item in value]
+    return value
+
+
+def build_payloads(db):
+    payloads = {}
+    for name, (collection, order_field) in PAYLOADS.items():
+        docs = [doc.to_dict() | {'id': doc.id} for doc in db.collection(collection).stream()]
+        if order_field:
+            docs.sort(key=lambda doc: doc.get(order_field) or 0, reverse=True)
+        payloads[name] = {'msg': 'Successfully fetched', 'items': _as_firestore(docs)}
+    return payloads
+
+
+def best_time(provider, payload, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = provider.response(payload)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(response.get_data())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare JSON providers on the large list payloads.')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the seeded volumes')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per payload and provider')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    db = MemoryFirestore()
+    seed(db, scale=args.scale, seed_value=args.seed)
+    payloads = build_payloads(db)
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FirestoreJSONProvider(app)
+
+    print(f"{'payload':<28} {'items':>6} {'kB':>8} {'default ms':>11} {'orjson ms':>10} {'speedup':>8}")
+    with app.app_context():
+        for name, payload in payloads.items():
+            default_time, size = best_time(default_provider, payload, args.repeat)
+            fast_time, _ = best_time(fast_provider, payload, args.repeat)
+            print(
+                f"{name:<28} {len(payload['items']):>6} {size / 1024:>8.1f} "
+                f"{default_time * 1000:>11.2f} {fast_time * 1000:>10.2f} {default_time / fast_time:>7.1f}x"
+            )
+
+
+if __name__ == '__main__':
+    main()
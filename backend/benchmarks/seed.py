@@ -0,0 +1,228 @@
+import datetime
+import random
+from app.routes.utils.comments_migration import make_excerpt
+from app.routes.utils.event_time import EVENT_TZ
+
+'''
+Seeds a data backend with realistic volumes for the endpoint benchmarks.
+Counts are per `scale` = 1; documents follow the shapes the handlers
+write, so every endpoint runs its normal code path.
+'''
+
+VOLUMES = {
+    'users': 2000,
+    'projects': 800,
+    'contributions': 4000,
+    'notifications': 6000,
+    'memories': 1500,
+    'events': 300,
+    'news': 200,
+    'posts': 600,
+    'community': 150,
+    'workshops': 40,
+    'bod': 12,
+    'polls': 20,
+}
+
+COMMITTEES = ['Coding Club', 'Robotics', 'Design', 'Events', 'Media']
+WORDS = (
+    'build ship learn code robot design team event workshop club project '
+    'python flask react cloud data model vision sensor arduino website'
+).split()
+BATCH_SIZE = 500
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _commit_all(db, collection, docs):
+    """Write (doc_id, data) pairs in batches; returns the ids."""
+    ids = []
+    batch, pending = db.batch(), 0
+    for doc_id, data in docs:
+        ref = db.collection(collection).document(doc_id)
+        batch.set(ref, data)
+        ids.append(ref.id)
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return ids
+
+
+def seed(db, scale: float = 1.0, seed_value: int = 42):
+    """
+    Fill `db` and return the ids the benchmark needs to build requests:
+    {'users': [...], 'admin': uid, 'projects': [...], 'posts': [...], ...}
+    """
+    rng = random.Random(seed_value)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    count = {name: max(1, int(volume * scale)) for name, volume in VOLUMES.items()}
+
+    def ago(max_days):
+        return now - datetime.timedelta(seconds=rng.randint(0, max_days * 86400))
+
+    users = []
+    for i in range(count['users']):
+        users.append((f'user{i:05d}', {
+            'name': f'Member {i}',
+            'email': f'member{i}@example.com',
+            'role': 'member',
+            'rank': rng.choice(['Newbie', 'Apprentice', 'Pro', 'Expert']),
+            'points': rng.randint(0, 5000),
+            'is_admin': i == 0,
+            'committee': rng.choice(COMMITTEES),
+            'memo_tokens': rng.randint(0, 10),
+            'workshops': [],
+        }))
+    user_ids = _commit_all(db, 'Users', users)
+
+    projects = []
+    for i in range(count['projects']):
+        author = rng.randrange(count['users'])
+        approved = rng.random() < 0.7
+        projects.append((None, {
+            'title': _text(rng, 4),
+            'description': _text(rng, 60),
+            'project_timeframe': '2025-01-01 to 2025-06-30',
+            'author': f'Member {author}',
+            'author_email': f'member{author}@example.com',
+            'github': '',
+            'committee': rng.choice(COMMITTEES),
+            'approved': approved,
+            'is_approved': approved,
+            'required_members': rng.randint(1, 6),
+            'unknown_members': [],
+            'members': [f'Member {rng.randrange(count["users"])}' for _ in range(rng.randint(0, 5))],
+            'points': rng.randint(0, 500),
+            'is_notified': approved,
+            'is_completed': rng.random() < 0.2,
+            'completion_requested': False,
+            'completion_request_date': None,
+            'created_at': ago(365),
+        }))
+    project_ids = _commit_all(db, 'projects', projects)
+
+    _commit_all(db, 'contributions', ((None, {
+        'uid': rng.choice(user_ids),
+        'project_id': rng.choice(project_ids),
+        'points': rng.randint(5, 100),
+        'created_at': ago(365),
+    }) for _ in range(count['contributions'])))
+
+    _commit_all(db, 'notifications', ((None, {
+        'title': _text(rng, 3),
+        'message': _text(rng, 20),
+        'type': rng.choice(['project', 'join_request', 'completion', 'info']),
+        'to_email': 'admin' if rng.random() < 0.1 else f'member{rng.randrange(count["users"])}@example.com',
+        'project_id': rng.choice(project_ids),
+        'from_email': 'ishannepal',
+        'read_status': rng.random() < 0.5,
+        'uid': None,
+        'created_at': ago(90),
+    }) for _ in range(count['notifications'])))
+
+    memories = []
+    for _ in range(count['memories']):
+        author = rng.randrange(count['users'])
+        photos = [f'https://res.cloudinary.com/demo/image/upload/v1/memories/{rng.getrandbits(48):x}.webp'
+                  for _ in range(rng.randint(1, 6))]
+        memories.append((None, {
+            'title': _text(rng, 4),
+            'author': f'Member {author}',
+            'author_id': user_ids[author],
+            'photos': photos,
+            'files_data': [{'cloudinary_url': url, 'bytes': rng.randint(10**5, 5 * 10**6)} for url in photos],
+            'created_at': ago(365),
+            'total_size_mb': round(rng.uniform(0.1, 20), 2),
+        }))
+    _commit_all(db, 'Gallery', memories)
+
+    events = []
+    for _ in range(count['events']):
+        starts_at = (now + datetime.timedelta(days=rng.randint(-300, 120))).astimezone(EVENT_TZ)
+        events.append((None, {
+            'title': _text(rng, 4),
+            'description': _text(rng, 40),
+            'date': starts_at.strftime('%Y-%m-%d'),
+            'time': starts_at.strftime('%H:%M'),
+            'location': rng.choice(['Hall A', 'Lab 2', 'Online']),
+            'starts_at': starts_at,
+            'status': 'upcoming' if starts_at > now else 'past',
+        }))
+    _commit_all(db, 'events', events)
+
+    _commit_all(db, 'community_news', ((None, {
+        'title': _text(rng, 5),
+        'content': _text(rng, 120),
+        'author': 'Admin',
+        'is_published': rng.random() < 0.9,
+        'image_url': None,
+        'created_at': ago(365),
+    }) for _ in range(count['news'])))
+
+    posts = []
+    for _ in range(count['posts']):
+        author = rng.randrange(count['users'])
+        content = _text(rng, 80)
+        posts.append((None, {
+            'title': _text(rng, 5),
+            'content': content,
+            'excerpt': make_excerpt(content),
+            'author': f'Member {author}',
+            'uid': user_ids[author],
+            'likes': 0,
+            'like_count': 0,
+            'comment_count': 0,
+            'created_at': ago(180),
+        }))
+    post_ids = _commit_all(db, 'posts', posts)
+
+    _commit_all(db, 'community_events', ((None, {
+        'title': _text(rng, 4),
+        'summary': _text(rng, 40),
+        'description': _text(rng, 300),
+        'date': ago(200).strftime('%Y-%m-%d'),
+        'image_url': None,
+        'created_at': ago(200),
+    }) for _ in range(count['community'])))
+
+    _commit_all(db, 'workshops', ((None, {
+        'title': _text(rng, 3),
+        'description': _text(rng, 30),
+        'email': f'member{rng.randrange(count["users"])}@example.com',
+        'created_at': ago(200),
+    }) for _ in range(count['workshops'])))
+
+    _commit_all(db, 'bod', ((None, {
+        'name': f'Board Member {i}',
+        'role': rng.choice(['President', 'Secretary', 'Treasurer', 'Lead']),
+        'image': None,
+        'comittee': 'BOD',
+        'created_at': ago(365),
+    }) for i in range(count['bod'])))
+
+    polls = []
+    for i in range(count['polls']):
+        polls.append((None, {
+            'question': _text(rng, 6) + '?',
+            'options': [{'id': str(j), 'text': _text(rng, 2)} for j in range(4)],
+            'status': 'Active' if i % 4 else 'Closed',
+            'created_by': 'member0@example.com',
+            'created_at': ago(60),
+            'closed_at': None,
+            'final_counts': None,
+        }))
+    poll_ids = _commit_all(db, 'polls', polls)
+
+    return {
+        'users': user_ids,
+        'admin': user_ids[0],
+        'projects': project_ids,
+        'posts': post_ids,
+        'polls': poll_ids,
+        'active_polls': [pid for pid, (_, data) in zip(poll_ids, polls) if data['status'] == 'Active'],
+    }